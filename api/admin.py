@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Fest, Event, EventRound, Participant, Gallery, Feedback, TeamMember, Schedule
+from django.db.models import Count
+from django.utils import timezone
+from .models import Fest, Event, EventRound, Participant, Gallery, Feedback, TeamMember, Schedule, Task, CertificateJob
 
 class ScheduleInline(admin.TabularInline):
     model = Schedule
@@ -22,10 +24,14 @@ class EventRoundInline(admin.TabularInline):
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'fest', 'coordinator', 'date', 'registration_count')
+    list_select_related = ('fest', 'coordinator')
     inlines = [EventRoundInline]
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(registrations_total=Count('registrations'))
+
     def registration_count(self, obj):
-        return obj.registrations.count()
+        return obj.registrations_total
 
 @admin.register(Participant)
 class ParticipantAdmin(admin.ModelAdmin):
@@ -35,4 +41,19 @@ class ParticipantAdmin(admin.ModelAdmin):
 
 admin.site.register(Gallery)
 admin.site.register(Feedback)
-admin.site.register(TeamMember)
\ No newline at end of file
+admin.site.register(TeamMember)
+
+@admin.register(CertificateJob)
+class CertificateJobAdmin(admin.ModelAdmin):
+    list_display = ('event', 'status', 'total', 'completed', 'skipped', 'failed', 'created_at')
+    list_filter = ('status',)
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter = ('status', 'name')
+    actions = ['retry']
+
+    @admin.action(description='Retry selected tasks')
+    def retry(self, request, queryset):
+        queryset.update(status=Task.STATUS_PENDING, attempts=0, run_after=timezone.now())
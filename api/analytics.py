@@ -0,0 +1,64 @@
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Avg
+from .models import Participant, Feedback
+
+def participant_stats(participants, by_event=False):
+    """
+    Registration statistics from a single GROUP BY over the dimensions the
+    dashboard breaks down by; everything else is summed up in Python.
+    """
+    dimensions = ['current_round', 'college_key', 'attended', 'is_winner']
+    if by_event:
+        dimensions.append('event_id')
+    rows = participants.order_by().values(*dimensions).annotate(count=Count('id'))
+
+    total = attended = winners = 0
+    rounds, colleges, events = Counter(), Counter(), Counter()
+    for row in rows:
+        count = row['count']
+        total += count
+        if row['attended']:
+            attended += count
+        if row['is_winner']:
+            winners += count
+        rounds[row['current_round']] += count
+        colleges[row['college_key']] += count
+        if by_event:
+            events[row['event_id']] += count
+
+    stats = {
+        "total_registrations": total,
+        "attended": attended,
+        "attendance_rate": (attended / total * 100) if total else 0,
+        "winners": winners,
+        "round_distribution": [{"round": r, "count": c} for r, c in sorted(rounds.items())],
+        "college_distribution": [{"college": name, "count": c} for name, c in colleges.most_common()],
+    }
+    if by_event:
+        stats["event_distribution"] = [{"event": pk, "count": c} for pk, c in events.most_common()]
+    return stats
+
+def feedback_stats(feedbacks):
+    result = feedbacks.aggregate(average=Avg('rating'), count=Count('id'))
+    return {"average_rating": result['average'] or 0, "feedback_count": result['count']}
+
+def _cached(key, compute):
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, settings.ANALYTICS_CACHE_TIMEOUT)
+    return data
+
+def event_analytics(event):
+    return _cached(f"analytics:event:{event.pk}", lambda: {
+        **participant_stats(Participant.objects.filter(event=event)),
+        **feedback_stats(Feedback.objects.filter(event=event)),
+    })
+
+def fest_analytics(fest):
+    return _cached(f"analytics:fest:{fest.pk}", lambda: {
+        **participant_stats(Participant.objects.filter(event__fest=fest), by_event=True),
+        **feedback_stats(Feedback.objects.filter(event__fest=fest)),
+    })
@@ -0,0 +1,156 @@
+"""
+Async versions of the busiest public read endpoints, routed ahead of the DRF
+views when DJANGO_SERVER_MODE=asgi (see config/urls.py).
+
+They answer anonymous GETs with the async ORM and the shared response cache,
+returning the same JSON as the DRF views. Anything else (writes, authenticated
+requests, query strings they don't understand, 404s) is handed to the DRF view.
+"""
+import math
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.urls import path, re_path
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from .models import Event, Fest, Participant
+from .serializers import EventSerializer, FestSerializer, ParticipantSerializer, PublicParticipantSerializer
+from .cache import acache_response
+from .leaderboard import acollege_leaderboard
+from .search import DOCUMENTS, search as search_documents
+from .live import event_stream
+
+# Values accepted by the is_team_event filter; others go to the DRF view
+BOOLEAN_PARAMS = {'true': True, 'True': True, 'false': False, 'False': False}
+
+def _json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+async def _paginate(request, queryset, serializer_class):
+    """
+    PageNumberPagination's response shape. Returns None for pages the DRF
+    view would reject, so it can produce the error.
+    """
+    page = request.GET.get('page', '1')
+    if not page.isdigit() or int(page) < 1:
+        return None
+    page = int(page)
+    page_size = api_settings.PAGE_SIZE
+    count = await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+    if page > num_pages:
+        return None
+
+    offset = (page - 1) * page_size
+    objects = [obj async for obj in queryset[offset:offset + page_size]]
+    url = request.build_absolute_uri()
+    if page == 2:
+        previous = remove_query_param(url, 'page')
+    else:
+        previous = replace_query_param(url, 'page', page - 1) if page > 1 else None
+    return {
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < num_pages else None,
+        'previous': previous,
+        'results': serializer_class(objects, many=True, context={'request': request}).data,
+    }
+
+@acache_response('events')
+async def event_list(request):
+    queryset = (
+        Event.objects.select_related('fest', 'coordinator')
+        .prefetch_related('rounds')
+        .annotate(registrations_total=Count('registrations'))
+        .order_by('date')
+    )
+    fest = request.GET.get('fest')
+    if fest:
+        # django-filter rejects unknown fests with a 400
+        if not fest.isdigit() or not await Fest.objects.filter(pk=fest).aexists():
+            return None
+        queryset = queryset.filter(fest_id=fest)
+
+    is_team_event = request.GET.get('is_team_event')
+    if is_team_event:
+        if is_team_event not in BOOLEAN_PARAMS:
+            return None
+        queryset = queryset.filter(is_team_event=BOOLEAN_PARAMS[is_team_event])
+
+    search = request.GET.get('search', '')
+    if search.strip():
+        # search() may query to decide between exact and fuzzy matches
+        queryset = await sync_to_async(search_documents)(queryset, DOCUMENTS['events'], search)
+
+    return await _paginate(request, queryset, EventSerializer)
+
+@acache_response('standings')
+async def qualifiers(request, pk):
+    if not pk.isdigit() or not await Event.objects.filter(pk=pk).aexists():
+        return None
+    participants = Participant.objects.filter(event_id=pk).order_by('-current_round', 'name')
+    return PublicParticipantSerializer([p async for p in participants], many=True).data
+
+@acache_response('standings')
+async def results(request, pk):
+    if not pk.isdigit():
+        return None
+    event = await Event.objects.filter(pk=pk).only('id', 'results_published').afirst()
+    if event is None:
+        return None
+    if not event.results_published:
+        return _json({"detail": "Results not yet published"}, status=403)
+    winners = Participant.objects.filter(event_id=pk, is_winner=True).select_related('event').order_by('rank')
+    return ParticipantSerializer([p async for p in winners], many=True).data
+
+async def college_leaderboard(request):
+    return _json(await acollege_leaderboard())
+
+@acache_response('fests')
+async def fest_list(request):
+    queryset = Fest.objects.prefetch_related('schedules').order_by('-year')
+    return await _paginate(request, queryset, FestSerializer)
+
+async def event_live(request, pk):
+    """Server-sent events with participant diffs for one event (see api/live.py)."""
+    if not await Event.objects.filter(pk=pk).aexists():
+        raise Http404("No Event matches the given query.")
+    response = StreamingHttpResponse(event_stream(pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _with_fallback(async_view, sync_view, params):
+    async def view(request, *args, **kwargs):
+        if (request.method in ('GET', 'HEAD') and 'HTTP_AUTHORIZATION' not in request.META
+                and set(request.GET) <= params):
+            response = await async_view(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+    return view
+
+# (pattern, router URL name, async view, query parameters it understands)
+ASYNC_ROUTES = [
+    (r'^events/$', 'event-list', event_list, {'fest', 'is_team_event', 'search', 'page'}),
+    (r'^events/college_leaderboard/$', 'event-college-leaderboard', college_leaderboard, set()),
+    (r'^events/(?P<pk>[^/.]+)/qualifiers/$', 'event-qualifiers', qualifiers, set()),
+    (r'^events/(?P<pk>[^/.]+)/results/$', 'event-results', results, set()),
+    (r'^fests/$', 'fest-list', fest_list, {'page'}),
+]
+
+def async_urlpatterns(router_urls):
+    """
+    URL patterns for the async views, to be placed before ``router_urls``.
+    Each one falls back to the router's view of the same name.
+    """
+    sync_views = {pattern.name: pattern.callback for pattern in router_urls}
+    return [
+        re_path(regex, _with_fallback(view, sync_views[name], params), name=name)
+        for regex, name, view, params in ASYNC_ROUTES
+    ]
+
+# Long-lived streams; a sync worker would be held for the whole connection
+live_urlpatterns = [
+    path('events/<int:pk>/live/', event_live, name='event-live'),
+]
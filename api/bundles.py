@@ -0,0 +1,145 @@
+"""
+Public fest bundle: everything the homepage renders, in one response.
+
+GET /api/fests/<id>/bundle/ serves a FestSnapshot row as stored: the JSON
+body, pre-compressed with gzip (and brotli when installed), under a strong
+ETag per encoding. Model signals (api/signals.py) call mark_stale() with the
+sections a change affects, and the next request rebuilds just those. Event
+data also expires when a registration deadline passes, since
+``is_registration_open`` depends on the clock.
+
+Sections are serialized without a request, so media URLs are relative.
+Live numbers (seats taken, registration counts) are left out; they would
+make the snapshot stale on every registration.
+"""
+import gzip
+import hashlib
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from .models import Event, FestSnapshot, Gallery, Schedule, TeamMember
+from .fields import select_fields
+from .serializers import EventSerializer, FestSerializer, GallerySerializer, ScheduleSerializer, TeamMemberSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def _serialize(queryset, serializer_class, **selection):
+    serializer = serializer_class(**selection)
+    return serializer_class(select_fields(queryset, serializer), many=True, **selection).data
+
+def _fest(fest):
+    return FestSerializer(fest, omit=['schedules']).data
+
+def _events(fest):
+    events = Event.objects.filter(fest=fest).order_by('date')
+    return _serialize(events, EventSerializer, omit=['registration_count', 'seats_taken'])
+
+def _schedules(fest):
+    return _serialize(Schedule.objects.filter(fest=fest).order_by('start_time'), ScheduleSerializer)
+
+def _team(fest):
+    return _serialize(TeamMember.objects.order_by('order'), TeamMemberSerializer)
+
+def _gallery(fest):
+    return _serialize(Gallery.objects.order_by('-uploaded_at'), GallerySerializer)
+
+SECTIONS = {
+    'fest': _fest,
+    'events': _events,
+    'schedules': _schedules,
+    'team': _team,
+    'gallery': _gallery,
+}
+
+def _next_registration_change(fest):
+    """When the next event's registration closes, i.e. is_registration_open flips."""
+    now = timezone.now()
+    closes = (
+        event.registration_deadline or event.date
+        for event in Event.objects.filter(fest=fest).only('date', 'registration_deadline')
+    )
+    return min((moment for moment in closes if moment > now), default=None)
+
+def is_fresh(snapshot):
+    return (
+        snapshot.version > 0 and not snapshot.stale
+        and (snapshot.expires_at is None or snapshot.expires_at > timezone.now())
+    )
+
+def fresh_snapshot(fest_id):
+    """The fest's snapshot if it can be served as is, else None. One query."""
+    snapshot = FestSnapshot.objects.defer('sections').filter(fest_id=fest_id).first()
+    return snapshot if snapshot is not None and is_fresh(snapshot) else None
+
+def rebuild_snapshot(fest):
+    """
+    Rebuilds the stale sections of ``fest``'s snapshot and re-renders it.
+    The row lock makes concurrent rebuilds wait, and keeps mark_stale() from
+    being lost between reading the data and clearing the flags.
+    """
+    with transaction.atomic():
+        snapshot, _ = FestSnapshot.objects.select_for_update().get_or_create(fest=fest)
+        if is_fresh(snapshot):
+            return snapshot
+
+        stale = set(snapshot.stale) | (SECTIONS.keys() - snapshot.sections.keys())
+        if snapshot.expires_at is not None and snapshot.expires_at <= timezone.now():
+            stale.add('events')
+        for name in stale:
+            snapshot.sections[name] = SECTIONS[name](fest)
+        if 'events' in stale:
+            snapshot.expires_at = _next_registration_change(fest)
+
+        content = JSONRenderer().render({name: snapshot.sections[name] for name in SECTIONS})
+        digest = hashlib.sha256(content).hexdigest()
+        if digest != snapshot.digest:
+            snapshot.version += 1
+            snapshot.digest = digest
+            # Sections render as the document's remaining keys
+            snapshot.body = b'{"version":%d,' % snapshot.version + content[1:]
+            snapshot.gzip_body = gzip.compress(snapshot.body, compresslevel=9, mtime=0)
+            snapshot.brotli_body = brotli.compress(snapshot.body) if brotli is not None else b''
+        snapshot.stale = []
+        snapshot.save()
+    return snapshot
+
+def mark_stale(sections, fest_ids=None):
+    """Flags ``sections`` of the given fests' snapshots (every fest's if None) for rebuilding."""
+    snapshots = FestSnapshot.objects.all() if fest_ids is None else FestSnapshot.objects.filter(fest_id__in=fest_ids)
+    with transaction.atomic():
+        for snapshot in snapshots.select_for_update().only('id', 'stale'):
+            missing = [name for name in sections if name not in snapshot.stale]
+            if missing:
+                snapshot.stale = snapshot.stale + missing
+                snapshot.save(update_fields=['stale'])
+
+def _accepts(request, coding):
+    codings = [part.split(';')[0].strip() for part in request.headers.get('Accept-Encoding', '').split(',')]
+    return coding in codings
+
+def bundle_response(request, snapshot):
+    """The snapshot in the best encoding the client accepts, or 304."""
+    body, coding = bytes(snapshot.body), None
+    if snapshot.brotli_body and _accepts(request, 'br'):
+        body, coding = bytes(snapshot.brotli_body), 'br'
+    elif _accepts(request, 'gzip'):
+        body, coding = bytes(snapshot.gzip_body), 'gzip'
+
+    # Strong validators must differ between encodings of the same content
+    etag = f'"{snapshot.fest_id}-{snapshot.version}-{snapshot.digest[:16]}{"-" + coding if coding else ""}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+        if coding:
+            response['Content-Encoding'] = coding
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
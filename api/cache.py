@@ -0,0 +1,125 @@
+"""
+Response cache for the public read endpoints.
+
+Anonymous GET responses are stored per namespace and full path (query string
+included) in the ``responses`` cache alias. Every namespace carries a version
+number; bumping it with ``invalidate()`` makes all of its entries unreachable,
+which is how the model signals in api/signals.py expire cached pages.
+"""
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseBase
+from rest_framework.renderers import JSONRenderer
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+def _version_key(namespace):
+    return f"resp:{namespace}:version"
+
+def _version(namespace):
+    cache = _cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), 1, None)
+        version = cache.get(_version_key(namespace), 1)
+    return version
+
+async def _aversion(namespace):
+    cache = _cache()
+    version = await cache.aget(_version_key(namespace))
+    if version is None:
+        await cache.aadd(_version_key(namespace), 1, None)
+        version = await cache.aget(_version_key(namespace), 1)
+    return version
+
+def invalidate(*namespaces):
+    cache = _cache()
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), 1, None)
+
+def _entry_key(namespace, version, request):
+    path_hash = hashlib.sha1(request.get_full_path().encode('utf-8')).hexdigest()
+    return f"resp:{namespace}:{version}:{path_hash}"
+
+def _make_entry(data):
+    body = JSONRenderer().render(data)
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+def _not_modified(request, etag):
+    candidates = request.headers.get('If-None-Match', '')
+    return etag in [c.strip() for c in candidates.split(',')] or candidates.strip() == '*'
+
+def _entry_response(request, entry):
+    body, etag = entry
+    if _not_modified(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+def cache_response(namespace=None):
+    """
+    Caches successful anonymous GET responses of a ViewSet method and answers
+    ``If-None-Match`` with 304. ``namespace`` defaults to the ViewSet's
+    ``cache_namespace``.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            ns = namespace or self.cache_namespace
+            key = _entry_key(ns, _version(ns), request)
+            cache = _cache()
+            entry = cache.get(key)
+            if entry is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                entry = _make_entry(response.data)
+                cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+            return _entry_response(request, entry)
+        return wrapper
+    return decorator
+
+def acache_response(namespace):
+    """
+    ``cache_response`` for the async views in api/async_views.py, sharing the
+    same entries. The view returns data to cache, or an HttpResponse (or None)
+    which is passed through uncached.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            key = _entry_key(namespace, await _aversion(namespace), request)
+            cache = _cache()
+            entry = await cache.aget(key)
+            if entry is None:
+                result = await view(request, *args, **kwargs)
+                if result is None or isinstance(result, HttpResponseBase):
+                    return result
+                entry = _make_entry(result)
+                await cache.aset(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+            return _entry_response(request, entry)
+        return wrapper
+    return decorator
+
+class CachedReadMixin:
+    """Caches list and retrieve for anonymous readers under ``cache_namespace``."""
+    cache_namespace = None
+
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response()
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,107 @@
+"""
+Certificate rendering helpers.
+
+This module deliberately avoids importing models: ``render_pdf`` runs inside
+ProcessPoolExecutor workers, which may not have Django's app registry loaded.
+"""
+import io
+import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape
+from xhtml2pdf import pisa
+
+TEMPLATE = 'certificates/participation.html'
+
+# Context keys that differ between participants sharing a layout
+PARTICIPANT_FIELDS = ('participant_name', 'college', 'rank')
+SLOT_PATTERN = re.compile(r'\[\[cert:(\w+)\]\]')
+
+def certificate_context(participant, event):
+    context = {
+        'participant_name': participant.name,
+        'college': participant.college,
+        'event_title': event.title,
+        'fest_name': event.fest.name if event.fest else "NEURA",
+        'year': event.date.year,
+        'title': 'Participation',
+        'type_class': 'participation'
+    }
+
+    if participant.is_winner:
+        context['title'] = 'Excellence'
+        context['type_class'] = 'excellence'
+        context['rank'] = participant.rank
+    return context
+
+def certificate_fingerprint(context):
+    """
+    Stable hash of everything printed on a certificate. A participant whose
+    stored hash matches does not need a new PDF.
+    """
+    payload = json.dumps([TEMPLATE, context], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class CertificateLayout:
+    """
+    The certificate template rendered once for a given event and certificate
+    type, with markers in place of the per-participant fields. Rendering a
+    participant is then a join over the pre-split HTML instead of a full
+    template render.
+    """
+    def __init__(self, layout_context, slots):
+        markers = {slot: f'[[cert:{slot}]]' for slot in slots}
+        html = render_to_string(TEMPLATE, {**layout_context, **markers})
+        # Even indexes are literal HTML, odd indexes are slot names
+        self.parts = SLOT_PATTERN.split(html)
+
+    def render(self, context):
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = conditional_escape(context[parts[i]])
+        return ''.join(parts)
+
+@lru_cache(maxsize=64)
+def _get_layout(layout_items, slots):
+    return CertificateLayout(dict(layout_items), slots)
+
+def get_layout(context):
+    """Returns the cached layout for this context's (event, certificate type)."""
+    # Falsy fields render the same as missing ones, so they need no slot
+    slots = tuple(field for field in PARTICIPANT_FIELDS if context.get(field))
+    layout_items = tuple(sorted(
+        (key, value) for key, value in context.items() if key not in PARTICIPANT_FIELDS
+    ))
+    return _get_layout(layout_items, slots)
+
+def render_html(context):
+    return get_layout(context).render(context)
+
+def render_pdf(html):
+    """Converts certificate HTML to PDF bytes. Returns None on render errors."""
+    result = io.BytesIO()
+    try:
+        pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
+    except Exception:
+        return None
+    if pdf.err:
+        return None
+    return result.getvalue()
+
+def render_many(contexts, workers=1, chunksize=8):
+    """
+    Yields PDF bytes (or None) for each context, in order. With more than one
+    worker the xhtml2pdf step fans out across a process pool; HTML is filled
+    in from cached layouts in this process.
+    """
+    htmls = (render_html(context) for context in contexts)
+    if workers <= 1:
+        for html in htmls:
+            yield render_pdf(html)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(render_pdf, htmls, chunksize=chunksize)
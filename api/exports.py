@@ -0,0 +1,61 @@
+import csv
+from django.http import StreamingHttpResponse
+
+EXPORT_COLUMNS = [
+    ('ID', 'id'),
+    ('Name', 'name'),
+    ('Team Name', 'team_name'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('College', 'college'),
+    ('Attended', 'attended'),
+    ('Current Round', 'current_round'),
+    ('Rank', 'rank'),
+    ('Winner', 'is_winner'),
+    ('Payment Ref', 'transaction_id'),
+]
+
+class Echo:
+    """File-like object whose write() hands the CSV line straight back."""
+    def write(self, value):
+        return value
+
+def registration_rows(queryset, custom_fields=(), include_event=False, chunk_size=2000):
+    """
+    Yields CSV lines for ``queryset`` of participants. Rows are fetched as
+    tuples in chunks (a server-side cursor on PostgreSQL), so memory stays
+    flat regardless of the number of registrations.
+    """
+    writer = csv.writer(Echo())
+    columns = [field for _, field in EXPORT_COLUMNS]
+    header = [label for label, _ in EXPORT_COLUMNS]
+    if include_event:
+        columns.append('event__title')
+        header.append('Event')
+    if custom_fields:
+        columns.append('custom_responses')
+        header.extend(custom_fields)
+
+    yield writer.writerow(header)
+    rows = queryset.order_by('id').values_list(*columns).iterator(chunk_size=chunk_size)
+    for row in rows:
+        (pk, name, team_name, email, phone, college, attended,
+         current_round, rank, is_winner, transaction_id, *extra) = row
+        line = [
+            pk, name, team_name or "N/A", email, phone, college,
+            "Yes" if attended else "No", current_round, rank or "-", "Yes" if is_winner else "No",
+            transaction_id or "N/A"
+        ]
+        if include_event:
+            line.append(extra.pop(0))
+        if custom_fields:
+            responses = extra.pop(0)
+            if not isinstance(responses, dict):
+                responses = {}  # custom_responses accepts any JSON value
+            line.extend(responses.get(label, "") for label in custom_fields)
+        yield writer.writerow(line)
+
+def csv_response(rows, filename):
+    response = StreamingHttpResponse(rows, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,181 @@
+"""
+Client-side field selection for the API's serializers.
+
+Reads accept ``?fields=`` (keep only these), ``?omit=`` (drop these) and
+``?expand=`` (replace a related id with the related object). Names are
+comma separated; dotted names reach into nested or expanded objects:
+
+    /api/participants/?fields=id,name,event&expand=event&omit=event.image
+
+An expanded object shows its serializer's ``summary_fields`` unless the
+request selects its fields explicitly (``fields=event.title,event.date``).
+
+FieldSelectionMixin turns the selected fields into the queryset's
+``.only()``, ``select_related()`` and ``prefetch_related()`` so that
+narrowing the response also narrows the SQL.
+"""
+import sys
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+def _names(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [name.strip() for name in value if name.strip()]
+
+def _split(names):
+    """['id', 'event.title'] -> ({'id', 'event'}, {'event': ['title']})"""
+    top, nested = set(), {}
+    for name in names or ():
+        head, _, rest = name.partition('.')
+        top.add(head)
+        if rest:
+            nested.setdefault(head, []).append(rest)
+    return top, nested
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin implementing ``fields``/``omit``/``expand``, taken from
+    the constructor or, for the top-level serializer of a read, from the
+    request's query string.
+
+    ``expandable_fields`` maps a field to the name of the serializer (in this
+    module's namespace) that renders the related object when expanded.
+    ``field_sources`` lists the model fields read by fields that don't map
+    onto one (properties, method fields); fields that are in neither keep
+    FieldSelectionMixin from deferring columns.
+    """
+    expandable_fields = {}
+    field_sources = {}
+    summary_fields = None
+
+    def __init__(self, *args, fields=None, omit=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        explicit = fields is not None or omit is not None or expand is not None
+        self._selection = (_names(fields), _names(omit) or [], _names(expand) or []) if explicit else None
+
+    def field_selection(self):
+        if self._selection is not None:
+            return self._selection
+        request = self.context.get('request')
+        parent = self.parent
+        is_root = parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+        if is_root and request is not None and request.method in SAFE_METHODS:
+            params = getattr(request, 'query_params', request.GET)
+            return (_names(params.get('fields')), _names(params.get('omit', '')), _names(params.get('expand', '')))
+        return (None, [], [])
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, omit, expand = self.field_selection()
+        only_top, only_nested = _split(only) if only is not None else (None, {})
+        _, omit_nested = _split(omit)
+        omit_top = {name for name in omit if '.' not in name}
+        expand_top, expand_nested = _split(expand)
+
+        for name in expand_top & self.expandable_fields.keys():
+            serializer_class = getattr(sys.modules[type(self).__module__], self.expandable_fields[name])
+            source = fields[name].source if name in fields else None
+            kwargs = {'source': source} if source and source != name else {}
+            fields[name] = serializer_class(
+                read_only=True,
+                fields=only_nested.get(name, serializer_class.summary_fields),
+                omit=omit_nested.get(name, []),
+                expand=expand_nested.get(name, []),
+                **kwargs,
+            )
+
+        if only_top is not None:
+            fields = {name: field for name, field in fields.items() if name in only_top}
+        for name in omit_top:
+            fields.pop(name, None)
+
+        # Pass dotted selections down to declared nested serializers
+        for name, field in fields.items():
+            child = getattr(field, 'child', field)
+            if isinstance(child, DynamicFieldsMixin) and child._selection is None:
+                child._selection = (only_nested.get(name), omit_nested.get(name, []), expand_nested.get(name, []))
+        return fields
+
+class _QueryPlan:
+    def __init__(self):
+        self.only = set()
+        self.select_related = set()
+        self.prefetch_related = set()
+        self.complete = True
+
+def _collect(serializer, model, prefix, plan):
+    plan.only.add(prefix + model._meta.pk.name)
+    field_sources = getattr(serializer, 'field_sources', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        sources = field_sources.get(name, getattr(field, 'source_fields', None))
+        if sources is not None:
+            plan.only.update(prefix + source for source in sources)
+            continue
+        if field.source == '*':
+            plan.complete = False
+            continue
+
+        current = model
+        for depth, attr in enumerate(field.source_attrs, 1):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                plan.complete = False  # Property or method; can't tell what it reads
+                break
+            lookup = prefix + '__'.join(field.source_attrs[:depth])
+            if model_field.one_to_many or model_field.many_to_many:
+                plan.prefetch_related.add(lookup)
+                break
+            plan.only.add(lookup)
+            if not model_field.is_relation:
+                break
+            if depth == len(field.source_attrs):
+                # The relation itself: an id, or an expanded object
+                if isinstance(field, serializers.Serializer):
+                    plan.select_related.add(lookup)
+                    _collect(field, model_field.related_model, lookup + '__', plan)
+                break
+            plan.select_related.add(lookup)
+            current = model_field.related_model
+
+def query_plan(serializer, model):
+    """Columns and relations ``serializer`` reads from ``model`` instances."""
+    plan = _QueryPlan()
+    _collect(getattr(serializer, 'child', serializer), model, '', plan)
+    return plan
+
+def select_fields(queryset, serializer):
+    """
+    Narrows ``queryset`` to what ``serializer`` renders and joins or
+    prefetches the relations it reads. Columns are only deferred when every
+    rendered field could be traced to the model.
+    """
+    plan = query_plan(serializer, queryset.model)
+    if plan.complete:
+        # Drop relations the view joined for fields that were not selected
+        queryset = queryset.select_related(None).prefetch_related(None).only(*plan.only)
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    return queryset
+
+class FieldSelectionMixin:
+    """
+    ViewSet mixin applying select_fields() to the querysets of
+    ``field_selection_actions``, shaped by the request's ``?fields=``,
+    ``?omit=`` and ``?expand=``.
+    """
+    field_selection_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.field_selection_actions and self.request.method in SAFE_METHODS:
+            queryset = select_fields(queryset, self.get_serializer())
+        return queryset
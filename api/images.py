@@ -0,0 +1,88 @@
+"""
+Image renditions: downscaled JPEG and WebP copies of uploaded images.
+
+The ``generate_renditions`` task writes them next to the original
+("gallery/photo.jpg" -> "gallery/renditions/photo_thumb.webp") and records
+their names in the model's ``renditions`` JSON, keyed by image field, along
+with the original they were made from. Replacing an upload therefore makes
+its renditions stale until the task runs again; until then serializers fall
+back to the original.
+"""
+import posixpath
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from .models import Event, Participant, Gallery, TeamMember
+
+# Image fields that get renditions, per model
+RENDITION_FIELDS = {
+    Gallery: ('image',),
+    TeamMember: ('image',),
+    Event: ('image', 'payment_qr'),
+    Participant: ('payment_proof',),
+}
+
+# (key suffix, Pillow format, file extension)
+FORMATS = (('', 'JPEG', 'jpg'), ('_webp', 'WEBP', 'webp'))
+
+def is_current(instance, field):
+    """True if the renditions of ``field`` match its file (or both are absent)."""
+    file = getattr(instance, field)
+    entry = instance.renditions.get(field)
+    if not file:
+        return entry is None
+    return entry is not None and entry.get('source') == file.name
+
+def stale_fields(instance):
+    return [field for field in RENDITION_FIELDS[type(instance)] if not is_current(instance, field)]
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.mode or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image
+
+def _encode(image, fmt):
+    if fmt == 'JPEG' and image.mode == 'RGBA':
+        # JPEG has no alpha; flatten onto white rather than black
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, fmt, quality=settings.IMAGE_RENDITION_QUALITY, optimize=fmt == 'JPEG')
+    return buffer.getvalue()
+
+def build_renditions(file):
+    """
+    Renders and stores every size/format of ``file`` (a FieldFile). Returns
+    the entry for ``Model.renditions``. Images are never upscaled.
+    """
+    with file.open('rb'):
+        image = _prepare(Image.open(file))
+        image.load()
+
+    stem = posixpath.splitext(posixpath.basename(file.name))[0]
+    directory = posixpath.join(posixpath.dirname(file.name), 'renditions')
+    entry = {'source': file.name}
+    for size_name, size in settings.IMAGE_RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for suffix, fmt, extension in FORMATS:
+            name = posixpath.join(directory, f"{stem}_{size_name}.{extension}")
+            entry[size_name + suffix] = file.storage.save(name, ContentFile(_encode(resized, fmt)))
+    return entry
+
+def delete_renditions(storage, entry):
+    for key, name in entry.items():
+        if key != 'source':
+            storage.delete(name)
+
+def rendition_urls(instance, field):
+    """Rendition URLs of ``field``, or None while they are missing or stale."""
+    file = getattr(instance, field)
+    entry = instance.renditions.get(field)
+    if not file or not entry or entry.get('source') != file.name:
+        return None
+    return {key: file.storage.url(name) for key, name in entry.items() if key != 'source'}
@@ -0,0 +1,205 @@
+"""
+Bulk registration import from a CSV or XLSX sheet.
+
+Rows are checked in passes over the whole sheet (required fields, formats,
+duplicates within the file and against existing registrations, team names,
+custom fields, then capacity) instead of running the registration
+serializer per row. Valid rows are inserted with bulk_create in batches;
+invalid rows are reported with their line number and don't stop the rest
+of the file.
+
+Headers are matched case-insensitively against the export's column labels
+("Team Name") or the field names ("team_name"); columns named after the
+event's custom fields fill ``custom_responses``.
+"""
+import io
+import csv
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from .exports import EXPORT_COLUMNS
+from .models import Event, Participant, get_student_users, normalize_college, normalize_email, student_username
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+IMPORT_FIELDS = ('name', 'email', 'phone', 'college', 'team_name', 'team_members', 'transaction_id')
+REQUIRED_FIELDS = ('name', 'email', 'phone', 'college')
+NULLABLE_FIELDS = ('team_name', 'team_members', 'transaction_id')
+
+class SheetError(Exception):
+    """The file as a whole can't be imported."""
+
+def _header_aliases():
+    aliases = {field: field for field in IMPORT_FIELDS}
+    aliases.update((label.lower(), field) for label, field in EXPORT_COLUMNS if field in IMPORT_FIELDS)
+    aliases.update((field.replace('_', ' '), field) for field in IMPORT_FIELDS)
+    return aliases
+
+def read_sheet(upload):
+    """
+    Returns (header, rows) of an uploaded .csv or .xlsx file, rows being
+    (line number, stripped cells). Blank lines are skipped.
+    """
+    name = upload.name.lower()
+    if name.endswith('.xlsx'):
+        if openpyxl is None:
+            raise SheetError("XLSX import needs the openpyxl package; upload a CSV instead.")
+        try:
+            book = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+        except Exception:
+            raise SheetError("Could not read the XLSX file.")
+        lines = ([('' if cell is None else str(cell)) for cell in row] for row in book.active.iter_rows(values_only=True))
+    elif name.endswith('.csv'):
+        try:
+            lines = list(csv.reader(io.TextIOWrapper(upload, encoding='utf-8-sig')))
+        except (UnicodeDecodeError, csv.Error):
+            raise SheetError("Could not read the CSV file; save it as UTF-8.")
+    else:
+        raise SheetError("Upload a .csv or .xlsx file.")
+
+    lines = iter(lines)
+    header = [cell.strip() for cell in next(lines, [])]
+    rows = []
+    for number, line in enumerate(lines, 2):
+        cells = [cell.strip() for cell in line]
+        if not any(cells):
+            continue
+        if len(rows) >= settings.IMPORT_MAX_ROWS:
+            raise SheetError(f"At most {settings.IMPORT_MAX_ROWS} rows can be imported at once.")
+        rows.append((number, cells))
+    return header, rows
+
+def _map_columns(event, header):
+    """{column index: field name or ('custom', label)}; raises SheetError for missing columns."""
+    aliases = _header_aliases()
+    custom = {label.lower(): label for label in event.custom_fields or []}
+    columns = {}
+    for index, title in enumerate(header):
+        key = title.lower()
+        if key in aliases:
+            columns[index] = aliases[key]
+        elif key in custom:
+            columns[index] = ('custom', custom[key])
+    present = set(columns.values())
+    missing = [field for field in REQUIRED_FIELDS if field not in present]
+    missing += [label for label in event.custom_fields or [] if ('custom', label) not in present]
+    if event.is_team_event and 'team_name' not in present:
+        missing.append('team_name')
+    if missing:
+        raise SheetError(f"Missing columns: {', '.join(missing)}")
+    return columns
+
+def _to_records(columns, rows):
+    records = []
+    for line, values in rows:
+        record = {field: '' for field in IMPORT_FIELDS}
+        record['line'] = line
+        record['custom_responses'] = {}
+        for index, target in columns.items():
+            value = values[index] if index < len(values) else ''
+            if isinstance(target, tuple):
+                record['custom_responses'][target[1]] = value
+            else:
+                record[target] = value
+        records.append(record)
+    return records
+
+def validate_rows(event, records):
+    """Returns {row index: [errors]} for ``records``, checked pass by pass."""
+    errors = {}
+
+    def reject(i, message):
+        errors.setdefault(i, []).append(message)
+
+    lengths = {f.name: f.max_length for f in Participant._meta.get_fields() if f.name in IMPORT_FIELDS}
+    for i, record in enumerate(records):
+        for field in REQUIRED_FIELDS:
+            if not record[field]:
+                reject(i, f"{field} is required")
+        for field, max_length in lengths.items():
+            if max_length and len(record[field]) > max_length:
+                reject(i, f"{field} is longer than {max_length} characters")
+        if record['email']:
+            try:
+                validate_email(record['email'])
+            except ValidationError:
+                reject(i, "email is not a valid email address")
+        if event.is_team_event and not record['team_name']:
+            reject(i, "team_name is required for team events")
+        blank = [label for label, value in record['custom_responses'].items() if not value]
+        if blank:
+            reject(i, f"Missing answers for: {', '.join(blank)}")
+
+    # Duplicates: within the file, then against the event's registrations
+    first_row = {}
+    for i, record in enumerate(records):
+        key = normalize_email(record['email'])
+        if key in first_row:
+            reject(i, f"Duplicate of row {records[first_row[key]]['line']}")
+        elif key:
+            first_row[key] = i
+    registered = set(
+        event.registrations.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=first_row).values_list('email_lower', flat=True)
+    )
+    for key in registered:
+        reject(first_row[key], "Already registered for this event")
+    return errors
+
+def _participant(event, record, user):
+    values = {field: record[field] or None if field in NULLABLE_FIELDS else record[field] for field in IMPORT_FIELDS}
+    return Participant(
+        event=event, user=user, college_key=normalize_college(record['college']),
+        custom_responses=record['custom_responses'], **values,
+    )
+
+def _reject_over_capacity(valid, errors, seats):
+    for i in valid[seats:]:
+        errors[i] = ["Event Full."]
+    return valid[:seats]
+
+def import_registrations(event, upload, dry_run=False):
+    """
+    Imports the sheet into ``event``. Returns a report:
+    {"total": rows, "valid": n, "created": n, "errors": [{"row": line, "email": .., "errors": [..]}]}
+    Rows that don't fit in the remaining seats are reported as errors. With
+    ``dry_run`` nothing is written and "created" is 0.
+    """
+    if not event.is_registration_open:
+        raise SheetError("Registration is closed for this event.")
+    header, rows = read_sheet(upload)
+    records = _to_records(_map_columns(event, header), rows)
+    errors = validate_rows(event, records)
+    valid = [i for i in range(len(records)) if i not in errors]
+
+    created = 0
+    if dry_run:
+        valid = _reject_over_capacity(valid, errors, max(0, event.max_participants - event.seats_taken))
+    elif valid:
+        with transaction.atomic():
+            # Lock the event so the seats counted here are the seats reserved
+            locked = Event.objects.select_for_update().only('seats_taken', 'max_participants').get(pk=event.pk)
+            valid = _reject_over_capacity(valid, errors, max(0, locked.max_participants - locked.seats_taken))
+            if valid:
+                locked.reserve_seats(len(valid))
+                users = get_student_users(records[i]['email'] for i in valid)
+                participants = Participant.objects.bulk_create(
+                    [_participant(event, records[i], users.get(student_username(records[i]['email']))) for i in valid],
+                    batch_size=settings.IMPORT_BATCH_SIZE,
+                )
+                created = len(participants)
+
+    return {
+        "total": len(records),
+        "created": created,
+        "valid": len(valid),
+        "errors": [
+            {"row": records[i]['line'], "email": records[i]['email'], "errors": messages}
+            for i, messages in sorted(errors.items())
+        ],
+    }
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, When, Value, IntegerField, Sum
+from .models import Participant
+
+CACHE_KEY = 'college_leaderboard'
+
+# Rank 1 = 10 pts, Rank 2 = 5 pts, Rank 3 = 3 pts
+RANK_POINTS = Case(
+    When(rank=1, then=Value(10)),
+    When(rank=2, then=Value(5)),
+    When(rank=3, then=Value(3)),
+    default=Value(0),
+    output_field=IntegerField(),
+)
+
+def _leaderboard_rows():
+    return (
+        Participant.objects.filter(is_winner=True)
+        .values('college_key')
+        .annotate(points=Sum(RANK_POINTS))
+        .order_by('-points', 'college_key')
+    )
+
+def college_leaderboard():
+    """
+    Points per college, highest first. Computed with one GROUP BY query and
+    cached until invalidate_college_leaderboard() is called.
+    """
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = [{"college": row['college_key'], "points": row['points']} for row in _leaderboard_rows()]
+        cache.set(CACHE_KEY, data, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return data
+
+async def acollege_leaderboard():
+    """Async twin of college_leaderboard(), sharing its cache entry."""
+    data = await cache.aget(CACHE_KEY)
+    if data is None:
+        data = [{"college": row['college_key'], "points": row['points']} async for row in _leaderboard_rows()]
+        await cache.aset(CACHE_KEY, data, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return data
+
+def invalidate_college_leaderboard():
+    cache.delete(CACHE_KEY)
@@ -0,0 +1,209 @@
+"""
+Live event updates pushed to spectators over server-sent events.
+
+Views publish participant diffs with ``publish_participants`` once their
+transaction commits; ``/api/events/<id>/live/`` streams them. The broker is
+chosen by ``settings.LIVE_BROKER``:
+
+- ``api.live.LocalBroker`` fans out inside this process only. That is enough
+  for tests and a single ASGI worker; with several workers a spectator only
+  sees changes made through the worker it is connected to.
+- ``api.live.DatabaseBroker`` writes each message to the LiveMessage table;
+  a thread in every process polls it and fans out to local spectators, so
+  all workers (and hosts) see every change, LIVE_POLL_INTERVAL late at most.
+
+Nothing is published unless DJANGO_SERVER_MODE=asgi, the only mode that
+serves the stream.
+"""
+import json
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from datetime import timedelta
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import LiveMessage
+
+logger = logging.getLogger(__name__)
+
+# Sent instead of the backlog when a slow spectator's queue overflows
+RESYNC = {"type": "resync"}
+
+class Subscription:
+    """
+    One spectator's queue. Created and read on the event loop serving the
+    connection; ``deliver`` may be called from any thread.
+    """
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Loop already closed: the connection is gone
+            self.close()
+
+    def _put(self, message):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next message, or None after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class LocalBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        return self.fan_out(channel, dict(message, id=next(self._ids)))
+
+    def fan_out(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+class DatabaseBroker(LocalBroker):
+    """
+    Shares messages between processes through the LiveMessage table. Message
+    ids are row ids, so they match on every worker. Rows are read again for
+    LIVE_POLL_OVERLAP seconds, since a row with a lower id can commit after
+    one with a higher id; ids already delivered are skipped.
+    """
+    def __init__(self, background=True):
+        super().__init__()
+        self._since = timezone.now()
+        self._delivered = {}  # message id -> created_at
+        self._pruned_at = 0.0
+        self._poller = None
+        self._background = background
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        if self._background and self._poller is None:
+            with self._lock:
+                if self._poller is None:
+                    self._poller = threading.Thread(target=self._run, name='live-broker', daemon=True)
+                    self._poller.start()
+        return subscription
+
+    def publish(self, channel, message):
+        LiveMessage.objects.create(channel=channel, payload=message)
+        # Publishers prune too: a process may never have a spectator to poll for
+        self.prune()
+
+    def prune(self):
+        """Deletes messages older than LIVE_MESSAGE_TTL, at most once per TTL per process."""
+        if time.monotonic() - self._pruned_at > settings.LIVE_MESSAGE_TTL:
+            self._pruned_at = time.monotonic()
+            expired = timezone.now() - timedelta(seconds=settings.LIVE_MESSAGE_TTL)
+            LiveMessage.objects.filter(created_at__lt=expired).delete()
+
+    def _run(self):
+        while True:
+            time.sleep(settings.LIVE_POLL_INTERVAL)
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling live messages failed")
+            finally:
+                close_old_connections()
+
+    def poll(self):
+        """Delivers messages published since the last poll to this process's spectators."""
+        now = timezone.now()
+        with self._lock:
+            channels = list(self._subscribers)
+        overlap = now - timedelta(seconds=settings.LIVE_POLL_OVERLAP)
+        since, self._since = self._since, now
+        if channels:
+            rows = (
+                LiveMessage.objects.filter(created_at__gte=min(since, overlap), channel__in=channels)
+                .order_by('id').values_list('id', 'channel', 'payload', 'created_at')
+            )
+            for pk, channel, payload, created_at in rows:
+                if pk not in self._delivered:
+                    self._delivered[pk] = created_at
+                    self.fan_out(channel, dict(payload, id=pk))
+        self._delivered = {pk: at for pk, at in self._delivered.items() if at >= overlap}
+        self.prune()
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.LIVE_BROKER)()
+
+def event_channel(event_id):
+    return f"event:{event_id}"
+
+def publish_participants(event_id, changes):
+    """
+    Broadcasts participant changes, e.g. ``[{"id": 4, "current_round": 2}]``,
+    to the event's spectators after the current transaction commits.
+    """
+    if not changes or settings.SERVER_MODE != 'asgi':
+        return  # /live/ is only routed in ASGI mode, so nobody is listening
+    message = {"type": "participants", "event": event_id, "changes": changes}
+    transaction.on_commit(lambda: get_broker().publish(event_channel(event_id), message), robust=True)
+
+def sse_format(message):
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+async def event_stream(event_id):
+    """
+    SSE body for one spectator: a ``ready`` event, then every published diff,
+    with comment heartbeats so idle proxies keep the connection open.
+    """
+    subscription = get_broker().subscribe(event_channel(event_id))
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\nevent: ready\ndata: {json.dumps({'event': event_id})}\n\n"
+        while True:
+            message = await subscription.get(timeout=settings.LIVE_HEARTBEAT)
+            if message is None:
+                yield ": keepalive\n\n"
+            elif message is RESYNC:
+                yield f"event: resync\ndata: {json.dumps({'event': event_id})}\n\n"
+            else:
+                yield sse_format(message)
+    finally:
+        subscription.close()
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from api.models import Fest, Event, Participant
+from api.certificates import TEMPLATE, certificate_context, render_html, render_pdf, render_many
+
+class Command(BaseCommand):
+    help = 'Benchmarks certificate rendering: per-participant template render vs cached layouts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participants', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4, help='Process pool size for the cached path')
+        parser.add_argument('--winners', type=int, default=3, help='Participants rendered as Excellence certificates')
+
+    def handle(self, *args, **options):
+        # Unsaved instances: the benchmark needs no database
+        fest = Fest(name="NEURA", year=2026)
+        event = Event(title="Benchmark Hackathon", fest=fest, date=datetime(2026, 3, 1))
+        participants = [
+            Participant(
+                id=i, name=f"Participant {i}", college=f"College {i % 40}",
+                is_winner=i <= options['winners'], rank=i if i <= options['winners'] else None
+            )
+            for i in range(1, options['participants'] + 1)
+        ]
+        contexts = [certificate_context(p, event) for p in participants]
+        count = len(contexts)
+
+        html_before = self.timed(lambda: [render_to_string(TEMPLATE, c) for c in contexts])
+        html_after = self.timed(lambda: [render_html(c) for c in contexts])
+        self.report('HTML, template render per participant', count, html_before)
+        self.report('HTML, cached layout', count, html_after)
+
+        pdf_before = self.timed(lambda: [render_pdf(render_to_string(TEMPLATE, c)) for c in contexts])
+        pdf_after = self.timed(lambda: list(render_many(contexts, workers=1)))
+        pdf_pool = self.timed(lambda: list(render_many(contexts, workers=options['workers'])))
+        self.report('PDF, before (sequential, template per participant)', count, pdf_before)
+        self.report('PDF, cached layout', count, pdf_after)
+        self.report(f"PDF, cached layout + {options['workers']} processes", count, pdf_pool)
+        self.stdout.write(f"Speedup vs before: {pdf_before / pdf_pool:.2f}x")
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def report(self, label, count, seconds):
+        self.stdout.write(f"{label:<55} {count / seconds:10.1f} /s  ({seconds:.2f}s)")
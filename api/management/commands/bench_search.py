@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.models import Event, Participant
+from api.search import DOCUMENTS, search
+
+FIRST_NAMES = ['Asha', 'Prakash', 'Meena', 'Ravi', 'Zoya', 'Arjun', 'Divya', 'Kiran', 'Nikhil', 'Sneha', 'Rahul', 'Fathima']
+LAST_NAMES = ['Rao', 'Iyer', 'Nair', 'Menon', 'Khan', 'Sharma', 'Pillai', 'Das', 'Joseph', 'Varma']
+
+# (label, query): full names, prefixes as typed at the desk, an email, a typo
+QUERIES = [
+    ('full name', 'Asha Rao'),
+    ('prefix', 'prak'),
+    ('two prefixes', 'ni me'),
+    ('email', 'kiran.das'),
+    ('team', 'squad 7'),
+    ('misspelled', 'Prakesh'),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks participant search: DRF SearchFilter (icontains) vs ranked full-text '
+        'search, on generated registrations that are rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participants', type=int, default=100000)
+        parser.add_argument('-n', '--iterations', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['participants'])
+            queryset = Participant.objects.order_by('-registered_at')
+            self.stdout.write(f"{Participant.objects.count()} participants, database: {connection.vendor}\n")
+            self.stdout.write(f"{'query':<14} {'SearchFilter p50':>17} {'hits':>7} {'search() p50':>13} {'hits':>7} {'speedup':>8}")
+            for label, text in QUERIES:
+                before, before_hits = self.measure(lambda: self.search_filter(queryset, text), options)
+                after, after_hits = self.measure(lambda: search(queryset, DOCUMENTS['participants'], text), options)
+                self.stdout.write(
+                    f"{label:<14} {before:14.2f} ms {before_hits:7} {after:10.2f} ms {after_hits:7} {before / after:7.1f}x"
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        event = Event.objects.create(title="Search Benchmark", date=timezone.now() + timedelta(days=30), max_participants=count)
+        rng = random.Random(0)
+        participants = []
+        for i in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            participants.append(Participant(
+                event=event, name=f"{first} {last}", email=f"{first}.{last}.{i}@bench.test".lower(),
+                phone=f"9{i:09d}", college=f"College {i % 40}", team_name=f"Squad {i % 500}",
+            ))
+        Participant.objects.bulk_create(participants, batch_size=2000)
+
+    def search_filter(self, queryset, text):
+        # What ParticipantViewSet did before: SearchFilter over its search_fields
+        request = Request(APIRequestFactory().get('/', {'search': text}))
+        view = SimpleNamespace(search_fields=['name', 'team_name', 'email'])
+        return SearchFilter().filter_queryset(request, queryset, view)
+
+    def measure(self, build, options):
+        """p50 in ms of a paginated list response's queries: COUNT plus the first page."""
+        timings = []
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            results = build()
+            hits = results.count()
+            list(results[:options['page_size']])
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), hits
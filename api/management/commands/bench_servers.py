@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import socket
+import statistics
+import subprocess
+import threading
+import urllib.request
+import urllib.error
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.models import Fest
+
+class Command(BaseCommand):
+    help = (
+        'Starts gunicorn in WSGI and ASGI mode (gunicorn.conf.py) and compares '
+        'throughput of concurrent clients on the public read endpoints, '
+        'optionally while slow CSV exports run in the background.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fest', type=int, help='Fest id to benchmark (default: latest, see seed_fest)')
+        parser.add_argument('--modes', nargs='*', default=['wsgi', 'asgi'], choices=['wsgi', 'asgi'])
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent readers')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per mode')
+        parser.add_argument('--workers', type=int, default=2, help='WEB_CONCURRENCY for the server')
+        parser.add_argument('--slow-clients', type=int, default=0,
+                            help='Clients looping over CSV exports while the readers run')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the response and leaderboard caches')
+        parser.add_argument('--output', help='Write JSON results to this file')
+
+    def handle(self, *args, **options):
+        fest = Fest.objects.filter(pk=options['fest']).first() if options['fest'] else Fest.objects.order_by('-id').first()
+        if not fest:
+            raise CommandError('No fest found. Run "manage.py seed_fest" first.')
+        event = fest.events.order_by('-seats_taken').first()
+        if not event:
+            raise CommandError(f'Fest #{fest.id} has no events.')
+
+        self.read_paths = [
+            f'/api/events/?fest={fest.id}',
+            f'/api/events/{event.id}/qualifiers/',
+            f'/api/events/{event.id}/results/',
+            '/api/events/college_leaderboard/',
+            '/api/fests/',
+        ]
+        self.slow_path = f'/api/events/{event.id}/export_registrations/'
+        self.slow_token = str(RefreshToken.for_user(event.coordinator).access_token)
+
+        results = {'fest': fest.id, 'event': event.id, 'clients': options['clients'],
+                   'slow_clients': options['slow_clients'], 'workers': options['workers'], 'modes': {}}
+        for mode in options['modes']:
+            self.stdout.write(f"Benchmarking {mode}...")
+            with self.server(mode, options) as base_url:
+                results['modes'][mode] = self.run_load(base_url, options)
+
+        self.stdout.write(f"\n{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'exports':>9}")
+        for mode, r in results['modes'].items():
+            lat = r['latency_ms']
+            self.stdout.write(f"{mode:<8}{r['throughput']:>10.1f}{lat['p50']:>10.1f}{lat['p95']:>10.1f}"
+                              f"{lat['p99']:>10.1f}{r['errors']:>8}{r['slow_completed']:>9}")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @contextmanager
+    def server(self, mode, options):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        env = dict(os.environ, DJANGO_SERVER_MODE=mode, WEB_CONCURRENCY=str(options['workers']))
+        if options['no_cache']:
+            env.update(CACHE_BACKEND='django.core.cache.backends.dummy.DummyCache', RESPONSE_CACHE_BACKEND='none')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            self.wait_until_ready(base_url, process)
+            yield base_url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def wait_until_ready(self, base_url, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'gunicorn exited with code {process.returncode}')
+            if self.fetch(base_url + '/api/fests/')[0] == 200:
+                return
+            time.sleep(0.2)
+        raise CommandError('gunicorn did not become ready in time')
+
+    def run_load(self, base_url, options):
+        stop = threading.Event()
+        latencies, errors, slow_done = [], [0], [0]
+        lock = threading.Lock()
+
+        def reader(n):
+            i = n
+            while not stop.is_set():
+                start = time.perf_counter()
+                status, _ = self.fetch(base_url + self.read_paths[i % len(self.read_paths)])
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    # Unpublished results answer 403 by design; only count failures
+                    if status is not None and status < 500:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+                i += 1
+
+        def slow_reader(n):
+            while not stop.is_set():
+                if self.fetch(base_url + self.slow_path, self.slow_token)[0] == 200:
+                    with lock:
+                        slow_done[0] += 1
+
+        clients = options['clients'] + options['slow_clients']
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for n in range(options['slow_clients']):
+                pool.submit(slow_reader, n)
+            started = time.perf_counter()
+            for n in range(options['clients']):
+                pool.submit(reader, n)
+            time.sleep(options['duration'])
+            stop.set()
+            elapsed = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError('No request succeeded; check the server logs.')
+        ordered = sorted(latencies)
+        pct = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+        return {
+            'requests': len(latencies),
+            'throughput': len(latencies) / elapsed,
+            'errors': errors[0],
+            'slow_completed': slow_done[0],
+            'latency_ms': {'mean': statistics.fmean(latencies), 'p50': pct(50), 'p95': pct(95), 'p99': pct(99)},
+        }
+
+    def fetch(self, url, token=None):
+        request = urllib.request.Request(url)
+        if token:
+            request.add_header('Authorization', f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, None
+        except (urllib.error.URLError, OSError):
+            return None, None
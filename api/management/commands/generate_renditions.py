@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from api.images import RENDITION_FIELDS, stale_fields
+from api.queue import enqueue_many
+from api.tasks import generate_renditions
+
+class Command(BaseCommand):
+    help = 'Queues rendition generation for existing images whose renditions are missing or stale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', nargs='*', choices=[m._meta.model_name for m in RENDITION_FIELDS],
+                            help='Limit to these models')
+        parser.add_argument('--inline', action='store_true', help='Generate now instead of queueing tasks')
+
+    def handle(self, *args, **options):
+        for model, fields in RENDITION_FIELDS.items():
+            if options['model'] and model._meta.model_name not in options['model']:
+                continue
+            # Rows with an image, or with renditions left over from a removed one
+            has_images = Q()
+            for field in fields:
+                has_images |= ~Q(**{field: ''}) & Q(**{f'{field}__isnull': False})
+            queryset = model.objects.filter(has_images | ~Q(renditions={})).only('pk', 'renditions', *fields)
+            pks = [obj.pk for obj in queryset.iterator() if stale_fields(obj)]
+
+            label = model._meta.label_lower
+            if options['inline']:
+                for pk in pks:
+                    generate_renditions(model=label, pk=pk)
+            else:
+                enqueue_many('generate_renditions', [{'model': label, 'pk': pk} for pk in pks])
+            self.stdout.write(f"{model.__name__}: {len(pks)} {'rendered' if options['inline'] else 'queued'}")
@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from api.models import Upload
+from api.uploads import discard
+
+class Command(BaseCommand):
+    help = 'Deletes chunked uploads that were never finished or never attached to a registration/event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.UPLOAD_EXPIRY_HOURS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = Upload.objects.filter(created_at__lt=cutoff).filter(Q(completed_at__isnull=True) | Q(used_at__isnull=True))
+        count = 0
+        for upload in stale.iterator():
+            discard(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {count} uploads"))
@@ -0,0 +1,188 @@
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import urllib.request
+import urllib.error
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.models import Fest
+from api.qr import qr_token
+
+class Command(BaseCommand):
+    help = (
+        'Drives the main API endpoints against a seeded fest (see seed_fest) and '
+        'reports p50/p95/p99 latency, requests/sec, queries per request and peak memory as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fest', type=int, help='Fest id to benchmark (default: latest)')
+        parser.add_argument('-n', '--iterations', type=int, default=30)
+        parser.add_argument('--url', help='Base URL of a running server (e.g. http://127.0.0.1:8000); '
+                                          'default is the in-process Django test client')
+        parser.add_argument('--only', nargs='*', help='Scenario names to run')
+        parser.add_argument('--cold', action='store_true', help='Clear caches before every request')
+        parser.add_argument('--output', help='Write JSON results to this file')
+
+    def handle(self, *args, **options):
+        fest = Fest.objects.filter(pk=options['fest']).first() if options['fest'] else Fest.objects.order_by('-id').first()
+        if not fest:
+            raise CommandError('No fest found. Run "manage.py seed_fest" first.')
+        event = fest.events.order_by('-seats_taken').first()
+        if not event:
+            raise CommandError(f'Fest #{fest.id} has no events.')
+
+        self.base_url = options['url']
+        self.client = Client(HTTP_HOST='localhost')
+        self.cold = options['cold']
+        self.coordinator_token = str(RefreshToken.for_user(event.coordinator).access_token)
+
+        results = {
+            'commit': self.git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'mode': 'http' if self.base_url else 'test-client',
+            'fest': fest.id,
+            'event': event.id,
+            'event_registrations': event.seats_taken,
+            'scenarios': {},
+        }
+        for name, scenario in self.scenarios(fest, event).items():
+            if options['only'] and name not in options['only']:
+                continue
+            self.stdout.write(f"Running {name}...")
+            results['scenarios'][name] = self.measure(scenario, options['iterations'])
+
+        self.print_table(results['scenarios'])
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def scenarios(self, fest, event):
+        """
+        Each scenario returns a callable taking the iteration number and
+        returning (method, path, body, token).
+        """
+        sample = list(event.registrations.values_list('id', 'email')[:1000])
+        counter = {'n': 0}
+
+        def register(i):
+            counter['n'] += 1
+            stamp = f"{int(time.time() * 1000)}_{counter['n']}"
+            return ('POST', '/api/participants/', {
+                'event': event.id, 'name': f"Bench {stamp}", 'email': f"bench_{stamp}@example.com",
+                'phone': stamp[-10:], 'college': "Benchmark College",
+                'team_name': "Bench Team" if event.is_team_event else "",
+            }, None)
+
+        return {
+            'events_list': lambda i: ('GET', f'/api/events/?fest={fest.id}', None, None),
+            'event_detail': lambda i: ('GET', f'/api/events/{event.id}/', None, None),
+            'qualifiers': lambda i: ('GET', f'/api/events/{event.id}/qualifiers/', None, None),
+            'college_leaderboard': lambda i: ('GET', '/api/events/college_leaderboard/', None, None),
+            'registration': register,
+            'scan_qr': lambda i: ('POST', '/api/participants/scan_qr/',
+                                  {'qr_data': qr_token(sample[i % len(sample)][0])}, self.coordinator_token),
+            'student_login': lambda i: ('POST', '/api/student-login/',
+                                        {'credential': sample[i % len(sample)][1]}, None),
+            'export_registrations': lambda i: ('GET', f'/api/events/{event.id}/export_registrations/',
+                                               None, self.coordinator_token),
+            'generate_certificates': lambda i: ('POST', f'/api/events/{event.id}/generate_certificates/',
+                                                None, self.coordinator_token),
+        }
+
+    def measure(self, scenario, iterations):
+        latencies, queries, statuses = [], [], {}
+        tracemalloc.start()
+        began = time.perf_counter()
+        for i in range(iterations):
+            if self.cold:
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            method, path, body, token = scenario(i)
+            start = time.perf_counter()
+            if self.base_url:
+                status, query_count = self.http_request(method, path, body, token), None
+            else:
+                with CaptureQueriesContext(connection) as ctx:
+                    status = self.client_request(method, path, body, token)
+                query_count = len(ctx.captured_queries)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if query_count is not None:
+                queries.append(query_count)
+            statuses[status] = statuses.get(status, 0) + 1
+        elapsed = time.perf_counter() - began
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'iterations': iterations,
+            'status_codes': statuses,
+            'latency_ms': {
+                'mean': statistics.fmean(latencies),
+                'p50': self.percentile(latencies, 50),
+                'p95': self.percentile(latencies, 95),
+                'p99': self.percentile(latencies, 99),
+                'max': max(latencies),
+            },
+            # Sequential, so this is 1/mean latency plus cache-clearing overhead
+            'requests_per_sec': iterations / elapsed,
+            'queries': {'mean': statistics.fmean(queries), 'max': max(queries)} if queries else None,
+            # Only meaningful in-process: the server's memory is not visible over HTTP
+            'peak_memory_kb': None if self.base_url else round(peak / 1024, 1),
+        }
+
+    def client_request(self, method, path, body, token):
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {token}"} if token else {}
+        if method == 'GET':
+            response = self.client.get(path, **headers)
+        else:
+            response = self.client.post(path, body or {}, content_type='application/json', **headers)
+        if getattr(response, 'streaming', False):
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def http_request(self, method, path, body, token):
+        data = json.dumps(body).encode() if body is not None else (b'' if method == 'POST' else None)
+        request = urllib.request.Request(self.base_url.rstrip('/') + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if token:
+            request.add_header('Authorization', f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def percentile(self, values, pct):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+        return ordered[index]
+
+    def git_commit(self):
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL
+            ).decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_table(self, scenarios):
+        self.stdout.write(f"\n{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>10}{'peak KB':>12}")
+        for name, r in scenarios.items():
+            lat = r['latency_ms']
+            q = f"{r['queries']['mean']:.1f}" if r['queries'] else '-'
+            mem = r['peak_memory_kb'] if r['peak_memory_kb'] is not None else '-'
+            self.stdout.write(f"{name:<24}{lat['p50']:>10.1f}{lat['p95']:>10.1f}{lat['p99']:>10.1f}{r['requests_per_sec']:>10.1f}{q:>10}{mem:>12}")
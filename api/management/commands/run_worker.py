@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from api import tasks  # noqa: F401 -- registers task functions
+from api.queue import DatabaseBackend
+
+class Command(BaseCommand):
+    help = 'Processes queued background tasks (certificates, image renditions, ...).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process due tasks and exit')
+        parser.add_argument('--batch', type=int, default=50, help='Tasks claimed per poll')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        backend = DatabaseBackend()
+        self.stdout.write('Worker started')
+        while True:
+            processed = backend.run_pending(limit=options['batch'])
+            if processed:
+                self.stdout.write(f'Processed {processed} task(s)')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
@@ -0,0 +1,89 @@
+import random
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.contrib.auth.hashers import make_password
+from api.models import Fest, Event, EventRound, Participant, Feedback, normalize_college, student_username
+
+COLLEGES = [
+    "Model Engineering College", "College of Engineering Trivandrum", "TKM College of Engineering",
+    "Rajagiri School of Engineering", "NIT Calicut", "Government Engineering College Thrissur",
+    "Mar Athanasius College", "Cochin University", "St. Joseph's College", "Amal Jyothi College",
+]
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "Arjun", "Fathima", "Nikhil", "Sneha", "Rahul", "Anjali", "Vishnu"]
+LAST_NAMES = ["Nair", "Menon", "Pillai", "Kurian", "Thomas", "Varghese", "Khan", "Das", "Joseph", "Iyer"]
+
+class Command(BaseCommand):
+    help = 'Seeds a realistic fest (events, rounds, participants, feedback) for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=40)
+        parser.add_argument('--participants', type=int, default=20000, help='Total registrations across all events')
+        parser.add_argument('--rounds', type=int, default=3, help='Rounds per event')
+        parser.add_argument('--feedback', type=int, default=25, help='Feedback entries per event')
+        parser.add_argument('--seed', type=int, default=42)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        per_event = max(1, options['participants'] // options['events'])
+
+        admin, _ = User.objects.get_or_create(username='bench_admin', defaults={'is_superuser': True, 'is_staff': True})
+        fest = Fest.objects.create(name="NEURA Benchmark", year=now.year)
+
+        coordinators = User.objects.bulk_create([
+            User(username=f"bench_fest{fest.id}_coord{i}") for i in range(options['events'])
+        ])
+        events = Event.objects.bulk_create([
+            Event(
+                fest=fest, coordinator=coordinators[i], title=f"Benchmark Event {i + 1}",
+                description="Seeded for benchmarking", date=now + timedelta(days=7),
+                is_team_event=i % 4 == 0, max_team_size=4 if i % 4 == 0 else 1,
+                max_participants=per_event * 2, custom_fields=["T-Shirt Size"], seats_taken=per_event,
+            )
+            for i in range(options['events'])
+        ])
+        EventRound.objects.bulk_create([
+            EventRound(event=event, round_number=r, name=f"Round {r}", selection_limit=max(3, per_event // (2 ** r)))
+            for event in events for r in range(1, options['rounds'] + 1)
+        ])
+
+        participants = []
+        for event in events:
+            for i in range(per_event):
+                college = rng.choice(COLLEGES)
+                current_round = 1 + sum(rng.random() < 0.4 for _ in range(options['rounds'] - 1))
+                participants.append(Participant(
+                    event=event,
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    email=f"student{event.id}_{i}@example.com",
+                    phone=f"9{event.id:04}{i:05}"[:15],
+                    college=college,
+                    college_key=normalize_college(college),
+                    team_name=f"Team {i}" if event.is_team_event else None,
+                    custom_responses={"T-Shirt Size": rng.choice("SML")},
+                    attended=rng.random() < 0.7,
+                    current_round=current_round,
+                    is_winner=i < 3,
+                    rank=i + 1 if i < 3 else None,
+                ))
+        # bulk_create skips Participant.save, so link student accounts here
+        students = User.objects.bulk_create([
+            User(username=student_username(p.email), email=p.email, password=make_password(None))
+            for p in participants
+        ], batch_size=2000)
+        for participant, user in zip(participants, students):
+            participant.user = user
+        Participant.objects.bulk_create(participants, batch_size=2000)
+
+        Feedback.objects.bulk_create([
+            Feedback(event=event, name="Seed", email="seed@example.com", rating=rng.randint(1, 5), message="Seeded")
+            for event in events for _ in range(options['feedback'])
+        ])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded fest #{fest.id}: {len(events)} events, {len(participants)} participants"
+        ))
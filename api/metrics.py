@@ -0,0 +1,107 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+Counters live in this worker process only; scrape every worker (or run a
+single one) to see the full picture.
+"""
+import re
+import threading
+from collections import defaultdict
+
+# Upper bounds in seconds, Prometheus-style cumulative buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r"IN \((%s|\?)(, ?(%s|\?))*\)")
+
+def sql_shape(sql):
+    """
+    Normalizes SQL so queries differing only in literal values compare equal,
+    e.g. the per-row lookups of an N+1.
+    """
+    sql = _QUOTED.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+class _Histogram:
+    __slots__ = ('buckets', 'count', 'total')
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latency = defaultdict(_Histogram)
+        self.db_time = defaultdict(_Histogram)
+        self.requests = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.n_plus_one = defaultdict(int)
+
+    def record(self, route, method, status, seconds, query_count, db_seconds, n_plus_one):
+        key = (route, method)
+        with self._lock:
+            self.latency[key].observe(seconds)
+            self.db_time[key].observe(db_seconds)
+            self.requests[(route, method, str(status))] += 1
+            self.queries[key] += query_count
+            if n_plus_one:
+                self.n_plus_one[key] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total Requests handled, by route, method and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (route, method, status), value in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{_labels(route, method)},status="{status}"}} {value}')
+
+            lines += self._histogram('http_request_duration_seconds', 'Request latency.', self.latency)
+            lines += self._histogram('http_request_db_seconds', 'Time spent in database queries per request.', self.db_time)
+
+            lines += [
+                '# HELP http_request_db_queries_total Database queries executed, by route.',
+                '# TYPE http_request_db_queries_total counter',
+            ]
+            for (route, method), value in sorted(self.queries.items()):
+                lines.append(f'http_request_db_queries_total{{{_labels(route, method)}}} {value}')
+
+            lines += [
+                '# HELP http_request_n_plus_one_total Requests that repeated one SQL shape METRICS_N_PLUS_ONE_THRESHOLD+ times.',
+                '# TYPE http_request_n_plus_one_total counter',
+            ]
+            for (route, method), value in sorted(self.n_plus_one.items()):
+                lines.append(f'http_request_n_plus_one_total{{{_labels(route, method)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _histogram(self, name, help_text, series):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (route, method), hist in sorted(series.items()):
+            labels = _labels(route, method)
+            for bound, count in zip(LATENCY_BUCKETS, hist.buckets):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{{labels}}} {hist.total:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {hist.count}')
+        return lines
+
+def _labels(route, method):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+registry = MetricsRegistry()
@@ -0,0 +1,129 @@
+import time
+import random
+import logging
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .metrics import registry, sql_shape
+
+logger = logging.getLogger(__name__)
+
+class QueryRecorder:
+    """
+    ``execute_wrapper`` hook counting queries, DB time and SQL shapes.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.shapes[sql] += 1
+
+    def repeated_shapes(self, threshold):
+        # Shapes are normalized lazily: identical SQL strings are already grouped
+        grouped = Counter()
+        for sql, count in self.shapes.items():
+            grouped[sql_shape(sql)] += count
+        return [(shape, count) for shape, count in grouped.most_common() if count >= threshold]
+
+class MetricsMiddleware:
+    """
+    Records latency, query count, DB time and N+1 suspects for a sample of
+    requests (``METRICS_SAMPLE_RATE``, 0 to disable). Results are served by
+    ``api/metrics/``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self.wrap_connections(stack, recorder)
+            response = self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            # Async ORM calls run on the request's sync thread, whose
+            # connection objects differ from the event loop thread's
+            await sync_to_async(self.wrap_connections)(stack, recorder)
+            response = await self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def sampled(self):
+        rate = settings.METRICS_SAMPLE_RATE
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def wrap_connections(self, stack, recorder):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+    def record(self, request, response, recorder, elapsed):
+        match = request.resolver_match
+        # URL names ("event-qualifiers") keep label cardinality bounded
+        route = (match.view_name or match.route) if match else 'unmatched'
+        suspects = recorder.repeated_shapes(settings.METRICS_N_PLUS_ONE_THRESHOLD)
+        if suspects:
+            shape, count = suspects[0]
+            logger.warning("Possible N+1 on %s %s: %d x %s", request.method, route, count, shape)
+
+        registry.record(
+            route, request.method, response.status_code, elapsed,
+            recorder.count, recorder.seconds, bool(suspects)
+        )
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise with an async path. The stock middleware is sync-only, which
+    would push every request in ASGI mode through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # Static lookups are in-memory unless autorefresh (DEBUG) is on
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+def backfill_college_key(apps, schema_editor):
+    Participant = apps.get_model('api', 'Participant')
+    batch = []
+    for participant in Participant.objects.only('id', 'college').iterator(chunk_size=2000):
+        participant.college_key = (participant.college or '').strip().title()
+        batch.append(participant)
+        if len(batch) >= 2000:
+            Participant.objects.bulk_update(batch, ['college_key'])
+            batch = []
+    Participant.objects.bulk_update(batch, ['college_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_certificatejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='college_key',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized college name', max_length=200),
+        ),
+        migrations.RunPython(backfill_college_key, migrations.RunPython.noop),
+    ]
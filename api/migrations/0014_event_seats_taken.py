@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats_taken(apps, schema_editor):
+    Event = apps.get_model('api', 'Event')
+    Participant = apps.get_model('api', 'Participant')
+    counts = (
+        Participant.objects.filter(event=OuterRef('pk'))
+        .order_by().values('event').annotate(total=Count('id')).values('total')
+    )
+    Event.objects.update(seats_taken=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_participant_college_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized registration count'),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+    ]
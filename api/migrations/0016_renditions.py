@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_participant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized image copies (api/images.py)'),
+        ),
+        migrations.AddField(
+            model_name='gallery',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized image copies (api/images.py)'),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized image copies (api/images.py)'),
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized image copies (api/images.py)'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:40
+
+import hashlib
+from django.contrib.auth.hashers import make_password
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def student_username(email):
+    # Frozen copy of api.models.student_username: usernames are capped at 150
+    # characters, emails at 254
+    if len(email) <= 150:
+        return email
+    digest = hashlib.sha1(email.encode('utf-8')).hexdigest()
+    return f"{email[:150 - len(digest) - 1]}#{digest}"
+
+
+def link_student_accounts(apps, schema_editor):
+    """Links registrations made before accounts were created at registration time."""
+    Participant = apps.get_model('api', 'Participant')
+    User = apps.get_model('auth', 'User')
+    emails = (
+        Participant.objects.filter(user__isnull=True).exclude(email='')
+        .annotate(email_lower=Lower('email')).values_list('email_lower', flat=True).distinct()
+    )
+    for email in list(emails):
+        email = email.strip()
+        username = student_username(email)
+        user = User.objects.filter(username__iexact=username).order_by('id').first()
+        if user is None:
+            user = User.objects.create(username=username, email=email, password=make_password(None))
+        elif user.is_staff or user.is_superuser:
+            continue
+        elif user.username != username and not User.objects.filter(username=username).exists():
+            # Older logins kept the email's original case as the username
+            user.username = username
+            user.save(update_fields=['username'])
+        Participant.objects.annotate(email_lower=Lower('email')).filter(
+            email_lower=email, user__isnull=True
+        ).update(user=user)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_upload'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_student_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_link_student_accounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FestSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sections', models.JSONField(default=dict, help_text='Serialized data per section')),
+                ('stale', models.JSONField(default=list, help_text='Sections to rebuild before serving')),
+                ('expires_at', models.DateTimeField(blank=True, help_text="Next time an event's registration opens or closes", null=True)),
+                ('version', models.PositiveIntegerField(default=0, help_text='Bumped whenever the content changes')),
+                ('digest', models.CharField(blank=True, max_length=64)),
+                ('body', models.BinaryField(default=b'')),
+                ('gzip_body', models.BinaryField(default=b'')),
+                ('brotli_body', models.BinaryField(default=b'', help_text='Empty unless the brotli package is installed')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fest', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='api.fest')),
+            ],
+        ),
+    ]
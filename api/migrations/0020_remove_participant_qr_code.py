@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:17
+
+from django.db import migrations
+
+
+def drop_queued_qr_tasks(apps, schema_editor):
+    # The generate_qr_code task no longer exists; QR codes are rendered on demand
+    Task = apps.get_model('api', 'Task')
+    Task.objects.filter(name='generate_qr_code').exclude(status='done').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_fest_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_queued_qr_tasks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='participant',
+            name='qr_code',
+        ),
+    ]
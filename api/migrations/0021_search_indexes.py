@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:40
+
+import operator
+from functools import reduce
+from django.db import migrations
+
+# PostgreSQL only: the GIN indexes behind api/search.py. The vectors must
+# compile to the same SQL as Document.vector() for the planner to use them.
+# SQLite's FTS5 tables are created by api.search.ensure_fts5 after migrate.
+SEARCH_INDEXES = {
+    'participant': ('participant_search_idx', {'name': 'A', 'team_name': 'B', 'email': 'C'}, 'participant_name_trgm_idx', 'name'),
+    'event': ('event_search_idx', {'title': 'A'}, 'event_title_trgm_idx', 'title'),
+}
+
+
+def _indexes():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    for model_name, (name, columns, trigram_name, fuzzy) in SEARCH_INDEXES.items():
+        vector = reduce(operator.add, (
+            SearchVector(column, weight=weight, config='simple') for column, weight in columns.items()
+        ))
+        yield model_name, GinIndex(vector, name=name)
+        yield model_name, GinIndex(fields=[fuzzy], opclasses=['gin_trgm_ops'], name=trigram_name)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for model_name, index in _indexes():
+        schema_editor.add_index(apps.get_model('api', model_name), index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in _indexes():
+        schema_editor.remove_index(apps.get_model('api', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_remove_participant_qr_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
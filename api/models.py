@@ -1,8 +1,66 @@
-from django.db import models
+import hashlib
+import uuid
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
 from django_resized import ResizedImageField
 
+class EventFull(Exception):
+    """Raised when a registration would exceed Event.max_participants."""
+
+def normalize_college(name):
+    """Canonical college name used to group participants across events."""
+    return (name or '').strip().title()
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+def student_username(email):
+    """
+    Username of the account shared by all of a student's registrations: the
+    normalized email, or for emails longer than a username can be (254 vs
+    150 characters) its start followed by a hash of the whole email.
+    """
+    email = normalize_email(email)
+    max_length = User._meta.get_field('username').max_length
+    if len(email) <= max_length:
+        return email
+    digest = hashlib.sha1(email.encode('utf-8')).hexdigest()
+    return f"{email[:max_length - len(digest) - 1]}#{digest}"
+
+def get_student_user(email):
+    """
+    The passwordless student account for ``email``, created on first use.
+    Returns None if the username belongs to a staff account, which must
+    never be reachable through student login.
+    """
+    user, _ = User.objects.get_or_create(
+        username=student_username(email),
+        defaults={'email': email, 'password': make_password(None)},
+    )
+    if user.is_staff or user.is_superuser:
+        return None
+    return user
+
+def get_student_users(emails):
+    """
+    get_student_user() for many emails with a fixed number of queries.
+    Returns {username: user}, with None for staff accounts.
+    """
+    usernames = {student_username(email): normalize_email(email) for email in emails}
+    users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+    missing = usernames.keys() - users.keys()
+    if missing:
+        User.objects.bulk_create(
+            [User(username=username, email=usernames[username], password=make_password(None)) for username in missing],
+            ignore_conflicts=True,
+        )
+        users.update((user.username, user) for user in User.objects.filter(username__in=missing))
+    return {username: None if user.is_staff or user.is_superuser else user for username, user in users.items()}
+
 class Fest(models.Model):
     name = models.CharField(max_length=200)
     year = models.IntegerField(default=timezone.now().year)
@@ -28,8 +86,10 @@ class Event(models.Model):
     min_team_size = models.IntegerField(default=1)
     max_team_size = models.IntegerField(default=1)
     max_participants = models.PositiveIntegerField(default=100)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False, help_text="Denormalized registration count")
     results_published = models.BooleanField(default=False)
     custom_fields = models.JSONField(blank=True, default=list, help_text="List of extra field labels")
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized image copies (api/images.py)")
 
     @property
     def is_registration_open(self):
@@ -37,6 +97,28 @@ class Event(models.Model):
             return timezone.now() < self.registration_deadline
         return timezone.now() < self.date
 
+    def reserve_seats(self, count=1):
+        """
+        Claims ``count`` seats with a single conditional UPDATE. Returns False,
+        without changing anything, if that would exceed max_participants.
+        """
+        return Event.objects.filter(
+            pk=self.pk, seats_taken__lte=F('max_participants') - count
+        ).update(seats_taken=F('seats_taken') + count) == 1
+
+    def release_seats(self, count=1):
+        Event.objects.filter(pk=self.pk, seats_taken__gte=count).update(seats_taken=F('seats_taken') - count)
+
+    def save(self, *args, **kwargs):
+        # seats_taken only changes through reserve_seats()/release_seats();
+        # a full save of a loaded instance would write back a stale count
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'seats_taken'
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -57,6 +139,7 @@ class Participant(models.Model):
     email = models.EmailField()
     phone = models.CharField(max_length=15)
     college = models.CharField(max_length=200)
+    college_key = models.CharField(max_length=200, blank=True, editable=False, help_text="Normalized college name")
     
     # Team fields
     team_name = models.CharField(max_length=100, blank=True, null=True)
@@ -71,19 +154,63 @@ class Participant(models.Model):
 
     # Status fields
     attended = models.BooleanField(default=False)
-    qr_code = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
     certificate = models.FileField(upload_to='certificates/', blank=True, null=True)
+    certificate_hash = models.CharField(max_length=64, blank=True, help_text="Fingerprint of the data the certificate was rendered from")
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized image copies (api/images.py)")
     current_round = models.IntegerField(default=1)
     is_winner = models.BooleanField(default=False)
     rank = models.IntegerField(null=True, blank=True)
     registered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'current_round'], name='participant_event_round_idx'),
+            models.Index(fields=['event', 'attended'], name='participant_event_attended_idx'),
+            # Partial: winners are a handful of rows, and the leaderboard groups them by college
+            models.Index(fields=['rank', 'college_key'], condition=models.Q(is_winner=True), name='participant_winner_rank_idx'),
+            models.Index(Lower('email'), name='participant_email_lower_idx'),
+            models.Index(fields=['phone'], name='participant_phone_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Credentials as loaded, so cached logins for replaced ones can be dropped
+        instance._loaded_credentials = (instance.__dict__.get('email'), instance.__dict__.get('phone'))
+        instance._loaded_standing = instance.standing()
+        return instance
+
+    def standing(self):
+        """(is_winner, rank, college_key) as far as loaded; what the college leaderboard reads."""
+        return tuple(self.__dict__.get(field) for field in ('is_winner', 'rank', 'college_key'))
+
+    def save(self, *args, **kwargs):
+        self.college_key = normalize_college(self.college)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'college' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'college_key'}
+
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        # New registration: take a seat first so the insert can never overbook.
+        # The savepoint hands the seat back if the insert fails.
+        with transaction.atomic():
+            if not self.event.reserve_seats():
+                raise EventFull(f"{self.event.title} is full.")
+            # Link the student account now so login is a single lookup
+            if self.user_id is None and self.email:
+                self.user = get_student_user(self.email)
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} - {self.event.title}"
 
 class Gallery(models.Model):
     title = models.CharField(max_length=100)
     image = models.ImageField(upload_to='gallery/')
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized image copies (api/images.py)")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
 class Feedback(models.Model):
@@ -98,6 +225,7 @@ class TeamMember(models.Model):
     name = models.CharField(max_length=100)
     role = models.CharField(max_length=100)
     image = models.ImageField(upload_to='team/', blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized image copies (api/images.py)")
     order = models.IntegerField(default=0)
 
     class Meta:
@@ -108,4 +236,134 @@ class Schedule(models.Model):
     title = models.CharField(max_length=200)
     start_time = models.DateTimeField()
     location = models.CharField(max_length=200)
-    description = models.TextField(blank=True)
\ No newline at end of file
+    description = models.TextField(blank=True)
+
+class CertificateJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='certificate_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0, help_text="Participants whose certificate was already current")
+    failed = models.IntegerField(default=0)
+    errors = models.JSONField(blank=True, default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def is_active(self):
+        return self.status in (self.STATUS_QUEUED, self.STATUS_RUNNING)
+
+    def __str__(self):
+        return f"Certificates for {self.event.title} ({self.status})"
+
+class Task(models.Model):
+    """
+    A unit of background work queued by api.queue.DatabaseBackend.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(blank=True, default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+class LiveMessage(models.Model):
+    """
+    A spectator update published by api.live.DatabaseBroker, read by every
+    web process and deleted after LIVE_MESSAGE_TTL seconds.
+    """
+    channel = models.CharField(max_length=64)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.channel} #{self.id}"
+
+class Upload(models.Model):
+    """
+    A file sent in chunks ahead of the form that uses it (see api/uploads.py).
+    Registrations and events reference it by ``token``; each upload can be
+    used once.
+    """
+    PURPOSE_PAYMENT_PROOF = 'payment_proof'
+    PURPOSE_EVENT_PDF = 'event_pdf'
+    PURPOSE_CHOICES = [
+        (PURPOSE_PAYMENT_PROOF, 'Payment proof'),
+        (PURPOSE_EVENT_PDF, 'Event PDF'),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField(help_text="Declared total size in bytes")
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes stored so far")
+    file = models.FileField(upload_to='uploads/', blank=True, max_length=255, help_text="Set once complete")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+class FestSnapshot(models.Model):
+    """
+    Precomputed public bundle of a fest (see api/bundles.py): the fest, its
+    events and schedule, the team and the gallery as one JSON document,
+    stored pre-compressed. Model signals flag the sections a change affects
+    in ``stale``; only those are rebuilt on the next request.
+    """
+    fest = models.OneToOneField(Fest, on_delete=models.CASCADE, related_name='snapshot')
+    sections = models.JSONField(default=dict, help_text="Serialized data per section")
+    stale = models.JSONField(default=list, help_text="Sections to rebuild before serving")
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="Next time an event's registration opens or closes")
+    version = models.PositiveIntegerField(default=0, help_text="Bumped whenever the content changes")
+    digest = models.CharField(max_length=64, blank=True)
+    body = models.BinaryField(default=b'')
+    gzip_body = models.BinaryField(default=b'')
+    brotli_body = models.BinaryField(default=b'', help_text="Empty unless the brotli package is installed")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.fest} v{self.version}"
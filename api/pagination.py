@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+class DashboardCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the coordinator dashboard grid. ``?ordering=``
+    picks one of ``ordering_fields`` (prefix with '-' for descending).
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-registered_at'
+    # CursorPagination positions on the first ordering field alone, so it
+    # must be non-null and varied: nullable rank and two-valued attended
+    # would skip rows or fall back to huge offsets
+    ordering_fields = ('registered_at', 'name', 'college_key', 'current_round')
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get('ordering', '')
+        if requested.lstrip('-') in self.ordering_fields:
+            # Cursor positions need a deterministic order within ties
+            tiebreak = '-id' if requested.startswith('-') else 'id'
+            return (requested, tiebreak)
+        return (self.ordering, '-id')
@@ -0,0 +1,130 @@
+"""
+Minimal background task queue.
+
+Task functions are registered with ``@task`` and queued with ``enqueue``.
+The backend is chosen by ``settings.TASK_QUEUE_BACKEND``:
+
+- ``api.queue.DatabaseBackend`` stores tasks in the ``Task`` table and
+  ``manage.py run_worker`` processes them.
+- ``api.queue.ImmediateBackend`` runs tasks inline, which is handy for
+  local development and tests.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func):
+    """Registers ``func`` as a task under its function name."""
+    _registry[func.__name__] = func
+    return func
+
+
+def enqueue(name, max_attempts=None, **payload):
+    """Queues the task ``name`` with keyword arguments ``payload``."""
+    if name not in _registry:
+        raise KeyError(f"Unknown task: {name}")
+    return get_backend().enqueue(name, payload, max_attempts=max_attempts)
+
+
+def enqueue_many(name, payloads, max_attempts=None):
+    """Queues ``name`` once per payload dict in ``payloads``."""
+    if name not in _registry:
+        raise KeyError(f"Unknown task: {name}")
+    return get_backend().enqueue_many(name, payloads, max_attempts=max_attempts)
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.TASK_QUEUE_BACKEND)()
+
+
+class ImmediateBackend:
+    def enqueue(self, name, payload, max_attempts=None):
+        _registry[name](**payload)
+
+    def enqueue_many(self, name, payloads, max_attempts=None):
+        for payload in payloads:
+            _registry[name](**payload)
+
+
+class DatabaseBackend:
+    def enqueue(self, name, payload, max_attempts=None):
+        return Task.objects.create(
+            name=name,
+            payload=payload,
+            max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        )
+
+    def enqueue_many(self, name, payloads, max_attempts=None):
+        """Queues one task per payload with a single INSERT."""
+        attempts = max_attempts or settings.TASK_MAX_ATTEMPTS
+        return Task.objects.bulk_create(
+            [Task(name=name, payload=p, max_attempts=attempts) for p in payloads],
+            batch_size=500,
+        )
+
+    def claim(self, limit):
+        """
+        Atomically marks up to ``limit`` due tasks as running and returns them.
+        Tasks left running by a crashed worker are picked up again once they
+        are older than TASK_STALE_AFTER seconds.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.TASK_STALE_AFTER)
+        candidates = Task.objects.filter(
+            Q(status=Task.STATUS_PENDING, run_after__lte=now) |
+            Q(status=Task.STATUS_RUNNING, updated_at__lt=stale)
+        ).values_list('id', 'status')[:limit]
+
+        claimed = [task_id for task_id, current_status in candidates if self._take(task_id, current_status, now, stale)]
+        return list(Task.objects.filter(id__in=claimed))
+
+    def _take(self, task_id, current_status, now, stale):
+        # Conditional UPDATE so concurrent workers never run the same task. A
+        # reclaimed task stays 'running', so it must also still be stale: the
+        # first worker to take it moves updated_at to now.
+        conditions = {'id': task_id, 'status': current_status}
+        if current_status == Task.STATUS_RUNNING:
+            conditions['updated_at__lt'] = stale
+        return Task.objects.filter(**conditions).update(status=Task.STATUS_RUNNING, updated_at=now) == 1
+
+    def execute(self, task_obj):
+        task_obj.attempts += 1
+        try:
+            func = _registry[task_obj.name]
+            func(**task_obj.payload)
+        except Exception:
+            task_obj.last_error = traceback.format_exc()
+            if task_obj.attempts >= task_obj.max_attempts:
+                task_obj.status = Task.STATUS_FAILED
+                logger.error("Task %s failed permanently", task_obj)
+            else:
+                delay = settings.TASK_RETRY_DELAY * 2 ** (task_obj.attempts - 1)
+                task_obj.status = Task.STATUS_PENDING
+                task_obj.run_after = timezone.now() + timedelta(seconds=delay)
+                logger.warning("Task %s failed, retrying in %ss", task_obj, delay)
+        else:
+            task_obj.status = Task.STATUS_DONE
+            task_obj.last_error = ''
+        task_obj.save(update_fields=['attempts', 'status', 'last_error', 'run_after', 'updated_at'])
+        return task_obj.status == Task.STATUS_DONE
+
+    def run_pending(self, limit=50):
+        """Runs one batch of due tasks. Returns the number processed."""
+        tasks = self.claim(limit)
+        for task_obj in tasks:
+            self.execute(task_obj)
+        return len(tasks)
@@ -0,0 +1,225 @@
+"""
+Ranked full-text search over participants and events.
+
+``?search=`` on the participant and event lists goes through search()
+instead of DRF's SearchFilter: every word of the query has to prefix-match
+a word of the document, and results are ordered by relevance (name before
+team name before email). When nothing matches, the name is compared by
+trigram similarity instead, so "Prakesh" at the check-in desk still finds
+"Prakash".
+
+PostgreSQL matches a weighted ``to_tsvector('simple', ...)`` with
+``to_tsquery`` and ranks with ts_rank; the GIN indexes that make this fast
+(and the pg_trgm index for similarity) are created by migration 0021.
+SQLite uses FTS5 tables kept in sync by triggers, ranked with bm25();
+ensure_fts5() creates them after every migrate, since rebuilding a table
+in a SQLite migration drops its triggers. Other databases fall back to
+LIKE, unranked.
+"""
+import re
+import operator
+from functools import reduce
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from rest_framework import filters
+from .models import Event, Participant
+
+# Words of a query: letters and digits, with inner '.', '@' and '-' kept so
+# that emails and hyphenated names stay one word
+WORD = re.compile(r'[^\W_]+(?:[.@-][^\W_]+)*')
+MAX_WORDS = 8
+
+TRIGRAM_THRESHOLD = 0.3  # pg_trgm's default similarity_threshold
+FUZZY_CANDIDATES = 200
+
+# ts_rank's default weights for A, B, C, D, reused as bm25() column weights
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+class Document:
+    """A model's searchable columns, each with a weight (A ranks highest), and the column compared for typos."""
+    def __init__(self, model, columns, fuzzy):
+        self.model = model
+        self.columns = columns
+        self.fuzzy = fuzzy
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_search'
+
+    @property
+    def trigram_table(self):
+        return f'{self.table}_trigram'
+
+    def vector(self):
+        # Keep in step with the GIN indexes in migration 0021
+        from django.contrib.postgres.search import SearchVector
+        return reduce(operator.add, (
+            SearchVector(column, weight=weight, config='simple') for column, weight in self.columns.items()
+        ))
+
+DOCUMENTS = {
+    'participants': Document(Participant, {'name': 'A', 'team_name': 'B', 'email': 'C'}, fuzzy='name'),
+    'events': Document(Event, {'title': 'A'}, fuzzy='title'),
+}
+
+def words(text):
+    return WORD.findall(text.lower())[:MAX_WORDS]
+
+def trigrams(text):
+    """pg_trgm's trigrams of ``text``: each word lowercased and padded with two spaces before, one after."""
+    grams = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a, b):
+    """pg_trgm's similarity(): shared trigrams over all trigrams of the two strings."""
+    a, b = trigrams(a), trigrams(b)
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def search(queryset, document, text, fuzzy=True):
+    """
+    ``queryset`` narrowed to rows matching ``text`` and ordered by relevance,
+    best first; the score is annotated as ``search_rank``. With ``fuzzy``,
+    a query matching nothing is retried by trigram similarity.
+    """
+    terms = words(text)
+    if not terms:
+        return queryset.none()
+    backend = BACKENDS.get(connections[queryset.db].vendor, LikeBackend)
+    results = backend.match(queryset, document, terms)
+    if fuzzy and document.fuzzy and not results.exists():
+        results = backend.similar(queryset, document, ' '.join(terms))
+    return results
+
+class PostgresBackend:
+    @staticmethod
+    def match(queryset, document, terms):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        query = SearchQuery(' & '.join(f"'{term}':*" for term in terms), search_type='raw', config='simple')
+        vector = document.vector()
+        return (
+            queryset.alias(search_vector=vector).filter(search_vector=query)
+            .annotate(search_rank=SearchRank(vector, query))
+            .order_by('-search_rank', '-pk')
+        )
+
+    @staticmethod
+    def similar(queryset, document, text):
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import TrigramSimilarity
+        return (
+            queryset.filter(TrigramSimilar(F(document.fuzzy), Value(text)))
+            .annotate(search_rank=TrigramSimilarity(document.fuzzy, text))
+            .order_by('-search_rank', '-pk')
+        )
+
+class SqliteBackend:
+    @staticmethod
+    def _join(queryset, document, table, match, rank):
+        return queryset.extra(
+            select={'search_rank': rank},
+            tables=[table],
+            where=[f'{table} MATCH %s', f'{table}.rowid = {document.table}.{document.model._meta.pk.column}'],
+            params=[match],
+        )
+
+    @classmethod
+    def match(cls, queryset, document, terms):
+        # The rank column is bm25() with the column weights (see
+        # _fts5_statements); unlike bm25() it also works in grouped queries
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = document.fts_table
+        return cls._join(queryset, document, table, match, f'-{table}.rank').order_by('-search_rank', '-pk')
+
+    @classmethod
+    def similar(cls, queryset, document, text):
+        # The trigram table finds rows sharing any trigram with the query;
+        # the best of those are scored like pg_trgm's similarity()
+        grams = {word[i:i + 3] for word in text.split() for i in range(len(word) - 2)}
+        if not grams:
+            return queryset.none()
+        table = document.trigram_table
+        candidates = (
+            cls._join(queryset, document, table, ' OR '.join(f'"{gram}"' for gram in sorted(grams)), f'{table}.rank')
+            .order_by('search_rank').values_list('pk', document.fuzzy)[:FUZZY_CANDIDATES]
+        )
+        scores = {pk: similarity(text, value) for pk, value in candidates}
+        scores = {pk: score for pk, score in scores.items() if score >= TRIGRAM_THRESHOLD}
+        if not scores:
+            return queryset.none()
+        rank = Case(*(When(pk=pk, then=Value(score)) for pk, score in scores.items()), output_field=FloatField())
+        return queryset.filter(pk__in=scores).annotate(search_rank=rank).order_by('-search_rank', '-pk')
+
+class LikeBackend:
+    @staticmethod
+    def match(queryset, document, terms):
+        for term in terms:
+            queryset = queryset.filter(reduce(operator.or_, (Q(**{f'{column}__icontains': term}) for column in document.columns)))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    @staticmethod
+    def similar(queryset, document, text):
+        return queryset.none()
+
+BACKENDS = {'postgresql': PostgresBackend, 'sqlite': SqliteBackend}
+
+def _fts5_statements(document):
+    table, pk = document.table, document.model._meta.pk.column
+    columns = ', '.join(document.columns)
+    new = ', '.join(f'new.{column}' for column in document.columns)
+    old = ', '.join(f'old.{column}' for column in document.columns)
+    weights = ', '.join(str(WEIGHTS[weight]) for weight in document.columns.values())
+    fts, trigram, fuzzy = document.fts_table, document.trigram_table, document.fuzzy
+    insert = (
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{pk}, {new});"
+        f" INSERT INTO {trigram}(rowid, {fuzzy}) VALUES (new.{pk}, new.{fuzzy});"
+    )
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.{pk}, {old});"
+        f" INSERT INTO {trigram}({trigram}, rowid, {fuzzy}) VALUES ('delete', old.{pk}, old.{fuzzy});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='{pk}',"
+        f" tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {trigram} USING fts5({fuzzy}, content='{table}', content_rowid='{pk}',"
+        f" tokenize='trigram')",
+        f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF {columns} ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({weights})')",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        f"INSERT INTO {trigram}({trigram}) VALUES ('rebuild')",
+    ]
+
+def ensure_fts5(using):
+    """Creates the FTS5 tables and triggers of every document missing them, and indexes existing rows."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {name for (name,) in cursor.fetchall()}
+        for document in DOCUMENTS.values():
+            if f'{document.table}_search_update' in triggers:
+                continue
+            for suffix in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {document.table}_search_{suffix}')
+            for statement in _fts5_statements(document):
+                cursor.execute(statement)
+
+class RankedSearchFilter(filters.SearchFilter):
+    """
+    Drop-in for SearchFilter that runs ``?search=`` through search() over the
+    view's ``search_document`` (a key of DOCUMENTS).
+    """
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip():
+            return queryset
+        return search(queryset, DOCUMENTS[view.search_document], text)
@@ -1,29 +1,120 @@
 import json
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
 from django.http import QueryDict
-from .models import Event, EventRound, Participant, Gallery, Feedback, Fest, TeamMember, Schedule
+from django.conf import settings
+from .images import rendition_urls
+from .fields import DynamicFieldsMixin
+from .qr import qr_token, qr_url
+from .uploads import UploadError, validate_declaration
+from .models import EventFull, Event, EventRound, Participant, Gallery, Feedback, Fest, TeamMember, Schedule, CertificateJob, Upload
 
-class UserSerializer(serializers.ModelSerializer):
+class RenditionsField(serializers.Field):
+    """
+    Read-only URLs of an image field's renditions ({"thumb": .., "thumb_webp": ..,
+    "medium": .., "medium_webp": ..}); null until the worker has generated them.
+    """
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        self.source_fields = (image_field, 'renditions')
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def to_representation(self, instance):
+        urls = rendition_urls(instance, self.image_field)
+        request = self.context.get('request')
+        if urls and request is not None:
+            urls = {key: request.build_absolute_uri(url) for key, url in urls.items()}
+        return urls
+
+class UploadTokenField(serializers.UUIDField):
+    """
+    Write-only reference to a completed, unused Upload of ``purpose``.
+    Uploads started by a signed-in user can only be referenced by that user.
+    """
+    def __init__(self, purpose, **kwargs):
+        self.purpose = purpose
+        kwargs.setdefault('required', False)
+        super().__init__(write_only=True, **kwargs)
+
+    def to_internal_value(self, data):
+        token = super().to_internal_value(data)
+        upload = Upload.objects.filter(token=token, purpose=self.purpose, used_at__isnull=True).first()
+        request = self.context.get('request')
+        user_id = request.user.id if request is not None else None
+        if upload is None or (upload.created_by_id and upload.created_by_id != user_id):
+            raise serializers.ValidationError("Upload not found.")
+        if not upload.is_complete:
+            raise serializers.ValidationError(f"Upload is incomplete ({upload.received} of {upload.size} bytes).")
+        return upload
+
+class UploadReferenceMixin:
+    """
+    Attaches uploads referenced by token. ``upload_fields`` maps each
+    UploadTokenField to the model file field it fills.
+    """
+    upload_fields = {}
+
+    def claim_uploads(self, validated_data):
+        for token_field, file_field in self.upload_fields.items():
+            upload = validated_data.pop(token_field, None)
+            if upload is None:
+                continue
+            # Conditional UPDATE so two requests can't attach the same file
+            if not Upload.objects.filter(pk=upload.pk, used_at__isnull=True).update(used_at=timezone.now()):
+                raise serializers.ValidationError({token_field: ["Upload has already been used."]})
+            validated_data[file_field] = upload.file.name
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.claim_uploads(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.claim_uploads(validated_data)
+            return super().update(instance, validated_data)
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
 
-class EventRoundSerializer(serializers.ModelSerializer):
+class EventRoundSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'event': 'EventSerializer'}
+
     class Meta:
         model = EventRound
         fields = ['id', 'event', 'round_number', 'name', 'selection_limit']
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(DynamicFieldsMixin, UploadReferenceMixin, serializers.ModelSerializer):
     rounds = EventRoundSerializer(many=True, read_only=True)
-    registration_count = serializers.IntegerField(source='registrations.count', read_only=True)
+    registration_count = serializers.SerializerMethodField()
     coordinator_name = serializers.ReadOnlyField(source='coordinator.username')
     fest_name = serializers.ReadOnlyField(source='fest.name')
     is_registration_open = serializers.ReadOnlyField()
+    image_renditions = RenditionsField('image')
+    payment_qr_renditions = RenditionsField('payment_qr')
+    pdf_resource_upload = UploadTokenField(Upload.PURPOSE_EVENT_PDF)
+
+    upload_fields = {'pdf_resource_upload': 'pdf_resource'}
+    expandable_fields = {'fest': 'FestSerializer'}
+    field_sources = {'registration_count': ('seats_taken',), 'is_registration_open': ('date', 'registration_deadline')}
+    summary_fields = ['id', 'title', 'date', 'location', 'image']
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['renditions']
+
+    def get_registration_count(self, obj):
+        # EventViewSet annotates this; elsewhere (expanded, nested) read the
+        # denormalized counter rather than a COUNT per row
+        total = getattr(obj, 'registrations_total', None)
+        if total is None:
+            total = obj.seats_taken
+        return total
 
     def to_internal_value(self, data):
         if isinstance(data, QueryDict):
@@ -38,12 +129,33 @@ class EventSerializer(serializers.ModelSerializer):
                 data['custom_fields'] = []
         return super().to_internal_value(data)
 
-class ParticipantSerializer(serializers.ModelSerializer):
+class ParticipantSerializer(DynamicFieldsMixin, UploadReferenceMixin, serializers.ModelSerializer):
     event_title = serializers.ReadOnlyField(source='event.title')
+    qr_code = serializers.SerializerMethodField()
+    qr_token = serializers.SerializerMethodField()
+    payment_proof_renditions = RenditionsField('payment_proof')
+    payment_proof_upload = UploadTokenField(Upload.PURPOSE_PAYMENT_PROOF)
+
+    upload_fields = {'payment_proof_upload': 'payment_proof'}
+    expandable_fields = {'event': 'EventSerializer'}
+    field_sources = {'qr_code': (), 'qr_token': ()}
 
     class Meta:
         model = Participant
-        fields = '__all__'
+        exclude = ['renditions']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None and 'event' in fields:
+            # Seats are reserved per event at registration; moving one would bypass them
+            fields['event'].read_only = True
+        return fields
+
+    def get_qr_code(self, obj):
+        return qr_url(obj.pk, self.context.get('request'))
+
+    def get_qr_token(self, obj):
+        return qr_token(obj.pk)
 
     def to_internal_value(self, data):
         if isinstance(data, QueryDict):
@@ -67,41 +179,122 @@ class ParticipantSerializer(serializers.ModelSerializer):
             if not self.instance:
                 if not event.is_registration_open:
                     raise serializers.ValidationError("Registration is closed for this event.")
-                if event.registrations.count() >= event.max_participants:
-                    raise serializers.ValidationError("Event Full.")
             
             if event.is_team_event and not data.get('team_name') and (not self.instance or not self.instance.team_name):
                 raise serializers.ValidationError("Team Name is required for team events.")
         
         return data
 
-class PublicParticipantSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        # Capacity is enforced by Participant.save() reserving a seat atomically
+        try:
+            return super().create(validated_data)
+        except EventFull:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ["Event Full."]})
+
+class PublicParticipantSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Participant
         fields = ['name', 'team_name', 'college', 'current_round', 'is_winner', 'rank']
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'fest': 'FestSerializer'}
+
     class Meta:
         model = Schedule
         fields = '__all__'
 
-class FestSerializer(serializers.ModelSerializer):
+class FestSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     schedules = ScheduleSerializer(many=True, read_only=True)
+    summary_fields = ['id', 'name', 'year']
+
     class Meta:
         model = Fest
         fields = '__all__'
 
-class GallerySerializer(serializers.ModelSerializer):
+class GallerySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_renditions = RenditionsField('image')
+
     class Meta:
         model = Gallery
-        fields = '__all__'
+        exclude = ['renditions']
+
+class FeedbackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'event': 'EventSerializer'}
 
-class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Feedback
         fields = '__all__'
 
-class TeamMemberSerializer(serializers.ModelSerializer):
+class TeamMemberSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_renditions = RenditionsField('image')
+
     class Meta:
         model = TeamMember
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['renditions']
+
+class CertificateJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CertificateJob
+        fields = ['id', 'event', 'status', 'total', 'completed', 'skipped', 'failed', 'errors', 'created_at', 'updated_at']
+
+class RankingEntrySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    rank = serializers.IntegerField(min_value=1)
+
+class EventRankingSerializer(serializers.Serializer):
+    """
+    Final results for the event in ``context['event']``, ordered by rank.
+    Entries may share a rank (ties). Participants not listed lose any rank.
+    """
+    rankings = RankingEntrySerializer(many=True, allow_empty=True)
+
+    def validate_rankings(self, value):
+        ids = [entry['id'] for entry in value]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError("Each participant can only be ranked once.")
+        ranks = [entry['rank'] for entry in value]
+        if ranks != sorted(ranks):
+            raise serializers.ValidationError("Rankings must be ordered by rank.")
+        return value
+
+    def validate(self, data):
+        event = self.context['event']
+        ids = [entry['id'] for entry in data['rankings']]
+        rounds = dict(event.registrations.filter(id__in=ids).values_list('id', 'current_round'))
+
+        missing = [pk for pk in ids if pk not in rounds]
+        if missing:
+            raise serializers.ValidationError(f"Participants {missing} are not registered for this event.")
+
+        final_round = event.rounds.order_by('-round_number').first()
+        if final_round:
+            if len(ids) > final_round.selection_limit:
+                raise serializers.ValidationError(
+                    f"{final_round.name} allows at most {final_round.selection_limit} winners."
+                )
+            not_finalists = [pk for pk in ids if rounds[pk] < final_round.round_number]
+            if not_finalists:
+                raise serializers.ValidationError(
+                    f"Participants {not_finalists} have not reached {final_round.name}."
+                )
+        return data
+
+class UploadSerializer(serializers.ModelSerializer):
+    is_complete = serializers.ReadOnlyField()
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Upload
+        fields = ['token', 'purpose', 'filename', 'content_type', 'size', 'received', 'is_complete', 'chunk_size', 'created_at']
+        read_only_fields = ['token', 'received', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
+
+    def validate(self, data):
+        try:
+            validate_declaration(data['purpose'], data['content_type'], data['size'])
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+        return data
@@ -1,17 +1,83 @@
-import qrcode
-from io import BytesIO
-from django.core.files import File
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
 from django.dispatch import receiver
-from .models import Participant
+from .models import Fest, Event, EventRound, Participant, Gallery, TeamMember, Schedule
+from .cache import invalidate as invalidate_responses
+from .queue import enqueue
+from .leaderboard import invalidate_college_leaderboard
+from .images import RENDITION_FIELDS, stale_fields
+from .students import forget_credentials
+from .bundles import mark_stale
+from .search import ensure_fts5
+from . import tasks  # noqa: F401 -- registers task functions
 
 @receiver(post_save, sender=Participant)
-def on_registration(sender, instance, created, **kwargs):
-    if created:
-        # Generate QR Code
-        qr_data = f"ID:{instance.id}|Name:{instance.name}|Event:{instance.event.title}"
-        qr = qrcode.make(qr_data)
-        canvas = BytesIO()
-        qr.save(canvas, format='PNG')
-        instance.qr_code.save(f'qr_{instance.id}.png', File(canvas), save=False)
-        instance.save(update_fields=['qr_code'])
\ No newline at end of file
+def on_registration(sender, instance, **kwargs):
+    forget_credentials(instance.email, instance.phone, *getattr(instance, '_loaded_credentials', ()))
+    instance._loaded_credentials = (instance.email, instance.phone)
+    standing, loaded = instance.standing(), getattr(instance, '_loaded_standing', None)
+    if standing != loaded and (standing[0] or (loaded and loaded[0])):
+        invalidate_college_leaderboard()
+    instance._loaded_standing = standing
+
+@receiver(post_delete, sender=Participant)
+def on_registration_deleted(sender, instance, **kwargs):
+    forget_credentials(instance.email, instance.phone, *getattr(instance, '_loaded_credentials', ()))
+    Event(pk=instance.event_id).release_seats()
+    if instance.is_winner:
+        invalidate_college_leaderboard()
+
+def queue_renditions(sender, instance, update_fields=None, **kwargs):
+    fields = RENDITION_FIELDS[sender]
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    if instance.get_deferred_fields() & {*fields, 'renditions'}:
+        return
+    if stale_fields(instance):
+        model, pk = sender._meta.label_lower, instance.pk
+        transaction.on_commit(lambda: enqueue('generate_renditions', model=model, pk=pk), robust=True)
+
+for model in RENDITION_FIELDS:
+    post_save.connect(queue_renditions, sender=model, dispatch_uid=f'renditions_{model.__name__}')
+
+# Response cache namespaces (api/cache.py) that render each model
+CACHED_NAMESPACES = {
+    Fest: ('fests', 'events'),
+    Schedule: ('fests',),
+    Event: ('events', 'standings'),
+    EventRound: ('events',),
+    Participant: ('events', 'standings'),
+    Gallery: ('gallery',),
+    TeamMember: ('team',),
+}
+
+def expire_cached_responses(sender, **kwargs):
+    invalidate_responses(*CACHED_NAMESPACES[sender])
+
+for model in CACHED_NAMESPACES:
+    post_save.connect(expire_cached_responses, sender=model, dispatch_uid=f'expire_responses_{model.__name__}_save')
+    post_delete.connect(expire_cached_responses, sender=model, dispatch_uid=f'expire_responses_{model.__name__}_delete')
+
+# Fest bundle sections (api/bundles.py) that render each model, and the fests
+# a change affects (None: every fest)
+BUNDLE_SECTIONS = {
+    Fest: ('fest', lambda instance: [instance.pk]),
+    Event: ('events', lambda instance: [instance.fest_id]),
+    EventRound: ('events', lambda instance: Event.objects.filter(pk=instance.event_id).values('fest_id')),
+    Schedule: ('schedules', lambda instance: [instance.fest_id]),
+    TeamMember: ('team', lambda instance: None),
+    Gallery: ('gallery', lambda instance: None),
+}
+
+def expire_bundles(sender, instance, **kwargs):
+    section, fests = BUNDLE_SECTIONS[sender]
+    mark_stale([section], fests(instance))
+
+for model in BUNDLE_SECTIONS:
+    post_save.connect(expire_bundles, sender=model, dispatch_uid=f'expire_bundles_{model.__name__}_save')
+    post_delete.connect(expire_bundles, sender=model, dispatch_uid=f'expire_bundles_{model.__name__}_delete')
+
+@receiver(post_migrate)
+def install_search_tables(sender, using, **kwargs):
+    if sender.name == 'api':
+        ensure_fts5(using)
@@ -0,0 +1,74 @@
+"""
+Student (passwordless) login.
+
+Participants are linked to their student account when they register (see
+Participant.save), so resolving a credential is one indexed query on
+Lower(email) or phone with the user joined in. Resolutions are cached per
+credential; model signals drop the entry when a matching registration
+changes.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .models import Participant, User, get_student_user, normalize_email
+
+class StaffAccount(Exception):
+    """The credential belongs to a staff account, which can't log in here."""
+
+def normalize_credential(credential):
+    credential = (credential or '').strip()
+    return credential.lower() if '@' in credential else credential
+
+def _cache_key(credential):
+    digest = hashlib.sha1(normalize_credential(credential).encode('utf-8')).hexdigest()
+    return f"student_login:{digest}"
+
+def _user_snapshot(user):
+    return {'id': user.id, 'username': user.username, 'email': user.email, 'is_superuser': user.is_superuser}
+
+def registrations_for(credential):
+    """Registrations matching an email or phone, oldest first, with their account."""
+    credential = normalize_credential(credential)
+    return (
+        Participant.objects.select_related('user')
+        .alias(email_lower=Lower('email'))
+        .filter(Q(email_lower=credential) | Q(phone=credential))
+        .only('id', 'email', 'user__id', 'user__username', 'user__email',
+              'user__is_staff', 'user__is_superuser', 'user__is_active')
+        .order_by('id')
+    )
+
+def resolve_student(credential):
+    """
+    Returns an unsaved User carrying the fields login needs, or None if no
+    registration matches. Raises StaffAccount for staff credentials.
+    """
+    key = _cache_key(credential)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        participant = registrations_for(credential).first()
+        if participant is None:
+            return None
+        user = participant.user or link_student(participant.email)
+        if user is None or user.is_staff or user.is_superuser:
+            raise StaffAccount()
+        snapshot = _user_snapshot(user)
+        cache.set(key, snapshot, settings.STUDENT_LOGIN_CACHE_TIMEOUT)
+    return User(**snapshot, is_active=True)
+
+def link_student(email):
+    """
+    Links registrations made before accounts were created at registration
+    time (or bulk-inserted ones) to the student account.
+    """
+    user = get_student_user(email)
+    if user is not None:
+        Participant.objects.alias(email_lower=Lower('email')).filter(
+            email_lower=normalize_email(email), user__isnull=True
+        ).update(user=user)
+    return user
+
+def forget_credentials(*credentials):
+    cache.delete_many([_cache_key(c) for c in credentials if c])
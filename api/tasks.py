@@ -0,0 +1,99 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from .models import CertificateJob, Participant
+from .cache import invalidate as invalidate_responses
+from .certificates import certificate_context, certificate_fingerprint, render_many
+from .images import build_renditions, delete_renditions, stale_fields
+from .queue import task
+
+@task
+def generate_certificates(job_id):
+    """
+    Renders certificates for every attended participant of the job's event.
+    Participants whose certificate fingerprint is unchanged are skipped, so a
+    job retried after a crash only renders what is still missing.
+    """
+    job = CertificateJob.objects.select_related('event__fest').get(id=job_id)
+    event = job.event
+    job.status = CertificateJob.STATUS_RUNNING
+    job.completed = job.skipped = job.failed = 0
+    job.errors = []
+
+    pending = []
+    participants = event.registrations.filter(attended=True).order_by('id')
+    for p in participants:
+        context = certificate_context(p, event)
+        fingerprint = certificate_fingerprint(context)
+        if p.certificate and p.certificate_hash == fingerprint:
+            job.skipped += 1
+        else:
+            pending.append((p, context, fingerprint))
+    job.total = job.skipped + len(pending)
+    job.save()
+
+    progress_fields = ['completed', 'failed', 'errors', 'updated_at']
+    rendered = []
+
+    def save_progress(*fields):
+        # One UPDATE per batch; bulk_update sends no post_save per participant
+        Participant.objects.bulk_update(rendered, ['certificate', 'certificate_hash'])
+        rendered.clear()
+        job.save(update_fields=[*fields, *progress_fields])
+
+    def finish(status):
+        job.status = status
+        save_progress('status')
+        # Expire dependents once, rather than on every participant saved
+        if job.completed:
+            invalidate_responses('events', 'standings')
+
+    try:
+        pdfs = render_many(
+            [context for _, context, _ in pending],
+            workers=settings.CERTIFICATE_WORKERS,
+        )
+        for index, ((p, _, fingerprint), pdf) in enumerate(zip(pending, pdfs), start=1):
+            if pdf is None:
+                job.failed += 1
+                job.errors.append(f"Error generating for {p.name}")
+            else:
+                p.certificate.save(f"cert_{p.id}.pdf", ContentFile(pdf), save=False)
+                p.certificate_hash = fingerprint
+                rendered.append(p)
+                job.completed += 1
+
+            if index % settings.CERTIFICATE_PROGRESS_EVERY == 0:
+                save_progress()
+    except Exception as e:
+        job.errors.append(f"Job interrupted: {e}")
+        finish(CertificateJob.STATUS_FAILED)
+        raise
+
+    finish(CertificateJob.STATUS_DONE)
+
+@task
+def generate_renditions(model, pk):
+    """
+    Brings the renditions of every image field of one instance up to date.
+    ``model`` is a label such as "api.gallery".
+    """
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    fields = stale_fields(instance)
+    if not fields:
+        return
+
+    renditions = dict(instance.renditions)
+    for field in fields:
+        file = getattr(instance, field)
+        old = renditions.pop(field, None)
+        if old:
+            delete_renditions(file.storage, old)
+        if file:
+            renditions[field] = build_renditions(file)
+
+    instance.renditions = renditions
+    # post_save expires cached responses; the entries are current, so no requeue
+    instance.save(update_fields=['renditions'])
@@ -1,7 +1,38 @@
-from django.test import TestCase
-from django.utils import timezone
+import io
+import gzip
+import random
+import re
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from .models import Event, Participant
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.core.management import call_command
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections
+from django.db.models import Sum
+from django.contrib.auth.models import User
+from django.template.loader import render_to_string
+from django.urls import include, path
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from PIL import Image as PILImage
+from rest_framework.test import APIClient
+from .models import Fest, Event, EventRound, Participant, Task, CertificateJob, Feedback, Schedule, Gallery, FestSnapshot, TeamMember, LiveMessage, get_student_users, student_username
+from .leaderboard import RANK_POINTS
+from .queue import DatabaseBackend, task
+from .cache import _version
+from .certificates import TEMPLATE, render_html
+from .metrics import registry as metrics_registry
+from .middleware import QueryRecorder
+from .async_views import async_urlpatterns, live_urlpatterns
+from .live import DatabaseBroker, get_broker, event_channel
+from .students import registrations_for
+from .qr import qr_token, render_qr
 
 class EventRegistrationTest(TestCase):
     def setUp(self):
@@ -19,4 +50,1198 @@ class EventRegistrationTest(TestCase):
     def test_past_event_registration_fails(self):
         # Logic: Test that registering for a past event is blocked in the serializer
         # (Usually tested via API Client in DRF, but here is a model-level check)
-        self.assertFalse(self.past_event.is_registration_open)
\ No newline at end of file
+        self.assertFalse(self.past_event.is_registration_open)
+
+    def test_event_update_keeps_seat_count(self):
+        coordinator = User.objects.create_user(username="seat_coord")
+        event = Event.objects.create(title="Quiz", date=timezone.now() + timedelta(days=1), coordinator=coordinator)
+        stale = Event.objects.get(pk=event.pk)
+        for i in range(3):
+            Participant.objects.create(event=event, name=f"P{i}", email=f"p{i}@x.com", phone=str(i), college="MEC")
+
+        stale.title = "Quiz Finals"
+        stale.save()
+        client = APIClient()
+        client.force_authenticate(coordinator)
+        self.assertEqual(client.patch(f'/api/events/{event.id}/', {'location': "Hall B"}, format='json').status_code, 200)
+        Participant.objects.create(event=event, name="P3", email="p3@x.com", phone="3", college="MEC")
+
+        event.refresh_from_db()
+        self.assertEqual((event.title, event.location, event.seats_taken), ("Quiz Finals", "Hall B", 4))
+
+    def test_registration_cannot_move_to_another_event(self):
+        Participant.objects.create(event=self.future_event, name="P0", email="p0@x.com", phone="0", college="MEC")
+        other = Event.objects.create(title="Quiz", date=timezone.now() + timedelta(days=1))
+        participant = Participant.objects.create(event=other, name="P1", email="p1@x.com", phone="1", college="MEC")
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(username="move_admin", password="x"))
+        response = client.patch(f'/api/participants/{participant.id}/', {'event': self.future_event.id, 'name': "P1b"}, format='json')
+        self.assertEqual(response.status_code, 200)
+        participant.refresh_from_db()
+        self.future_event.refresh_from_db()
+        self.assertEqual((participant.event_id, participant.name), (other.id, "P1b"))
+        self.assertEqual(self.future_event.seats_taken, 1)
+
+class EventListQueryCountTest(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.fest = Fest.objects.create(name="NEURA", year=2026)
+
+    def make_events(self, count):
+        for i in range(count):
+            coordinator = User.objects.create_user(username=f"coord_{Event.objects.count()}")
+            event = Event.objects.create(
+                fest=self.fest, coordinator=coordinator, title=f"Event {i}",
+                description="", date=timezone.now() + timedelta(days=1)
+            )
+            EventRound.objects.create(event=event, round_number=1, name="Prelims")
+            for j in range(3):
+                Participant.objects.create(
+                    event=event, name=f"P{j}", email=f"p{j}@x.com", phone="1", college="C"
+                )
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()['results']
+
+    def test_query_count_is_flat(self):
+        self.make_events(2)
+        small, _ = self.count_list_queries()
+        self.make_events(6)
+        large, results = self.count_list_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(results[0]['registration_count'], 3)
+        self.assertEqual(results[0]['fest_name'], "NEURA")
+        self.assertEqual(len(results[0]['rounds']), 1)
+
+@task
+def _always_fails():
+    raise RuntimeError("boom")
+
+_calls = []
+
+@task
+def _records_call(value):
+    _calls.append(value)
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), TASK_RETRY_DELAY=0)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Quiz", description="", date=timezone.now() + timedelta(days=1)
+        )
+
+    def test_registration_queues_no_storage_work(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Participant.objects.create(event=self.event, name="Asha", email="asha@x.com", phone="1", college="C")
+        self.assertFalse(Task.objects.exists())
+
+    def test_pending_task_runs(self):
+        backend = DatabaseBackend()
+        queued = backend.enqueue('_records_call', {'value': 7})
+        self.assertEqual(backend.run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.STATUS_DONE)
+        self.assertEqual(_calls, [7])
+
+    def test_stale_task_reclaimed_by_one_worker(self):
+        backend = DatabaseBackend()
+        queued = backend.enqueue('_records_call', {'value': 1})
+        long_ago = timezone.now() - timedelta(seconds=settings.TASK_STALE_AFTER + 60)
+        Task.objects.filter(pk=queued.pk).update(status=Task.STATUS_RUNNING, updated_at=long_ago)
+
+        # Both workers saw the stale row before either claimed it
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.TASK_STALE_AFTER)
+        won = [backend._take(queued.pk, Task.STATUS_RUNNING, now, stale) for _ in range(2)]
+        self.assertEqual(won, [True, False])
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        backend = DatabaseBackend()
+        queued = backend.enqueue('_always_fails', {}, max_attempts=2)
+        backend.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.STATUS_PENDING)
+        self.assertIn("boom", queued.last_error)
+
+        backend.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.STATUS_FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+class CertificateLayoutTest(TestCase):
+    def test_cached_layout_matches_template_render(self):
+        base = {
+            'event_title': 'Code & <Build>', 'fest_name': 'NEURA', 'year': 2026,
+            'title': 'Participation', 'type_class': 'participation'
+        }
+        variants = [
+            {'participant_name': '<script>x</script>', 'college': "O'Brien & Co"},
+            {'participant_name': 'Asha', 'college': '', 'rank': None, 'title': 'Excellence', 'type_class': 'excellence'},
+            {'participant_name': 'Ravi', 'college': 'MEC', 'rank': 2, 'title': 'Excellence', 'type_class': 'excellence'},
+        ]
+        for extra in variants:
+            context = {**base, **extra}
+            self.assertEqual(render_html(context), render_to_string(TEMPLATE, context))
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), CERTIFICATE_WORKERS=1)
+class CertificateJobTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coordinator = User.objects.create_user(username="coord")
+        self.event = Event.objects.create(
+            title="Hackathon", description="", coordinator=self.coordinator,
+            date=timezone.now() + timedelta(days=1)
+        )
+        for i in range(3):
+            Participant.objects.create(
+                event=self.event, name=f"P{i}", email=f"p{i}@x.com", phone="1",
+                college="C", attended=i < 2
+            )
+        Task.objects.all().delete()
+        self.client.force_authenticate(self.coordinator)
+
+    def start_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/events/{self.event.id}/generate_certificates/')
+        self.assertEqual(response.status_code, 202)
+        DatabaseBackend().run_pending()
+        return self.client.get(f'/api/events/{self.event.id}/certificate_status/').data
+
+    def test_job_renders_then_skips_current_certificates(self):
+        job = self.start_job()
+        self.assertEqual(job['status'], CertificateJob.STATUS_DONE)
+        self.assertEqual((job['total'], job['completed'], job['skipped']), (2, 2, 0))
+        self.assertEqual(Participant.objects.exclude(certificate='').exclude(certificate=None).count(), 2)
+
+        Participant.objects.filter(name="P0").update(name="P0 Renamed")
+        job = self.start_job()
+        self.assertEqual((job['total'], job['completed'], job['skipped']), (2, 1, 1))
+
+    @override_settings(CERTIFICATE_PROGRESS_EVERY=1)
+    def test_job_expires_cached_responses_once(self):
+        before = _version('standings')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.start_job()['completed'], 2)
+        self.assertEqual(_version('standings'), before + 1)
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_participant"') and 'CASE' not in q['sql']])
+
+class CollegeLeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(username="admin", password="x")
+        event = Event.objects.create(title="Quiz", description="", date=timezone.now() + timedelta(days=1))
+        self.first = Participant.objects.create(event=event, name="A", email="a@x.com", phone="1", college="  model engineering college ")
+        self.second = Participant.objects.create(event=event, name="B", email="b@x.com", phone="2", college="Model Engineering College")
+        self.third = Participant.objects.create(event=event, name="C", email="c@x.com", phone="3", college="CET")
+
+    def rank(self, participant, rank):
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/participants/{participant.id}/assign_rank/', {'rank': rank})
+        self.client.force_authenticate(None)
+
+    def test_points_are_aggregated_and_cache_invalidated(self):
+        self.rank(self.first, 1)
+        self.rank(self.third, 2)
+        data = self.client.get('/api/events/college_leaderboard/').data
+        self.assertEqual(data, [
+            {"college": "Model Engineering College", "points": 10},
+            {"college": "Cet", "points": 5},
+        ])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/events/college_leaderboard/')
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.rank(self.second, 3)
+        data = self.client.get('/api/events/college_leaderboard/').data
+        self.assertEqual(data[0], {"college": "Model Engineering College", "points": 13})
+
+    def test_participant_edits_invalidate_cache(self):
+        self.rank(self.third, 1)
+        self.client.get('/api/events/college_leaderboard/')
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f'/api/participants/{self.third.id}/', {'college': "TKM"}, format='json')
+        self.assertEqual(self.client.get('/api/events/college_leaderboard/').data, [{"college": "Tkm", "points": 10}])
+
+        self.client.patch(f'/api/participants/{self.third.id}/', {'rank': 2}, format='json')
+        self.assertEqual(self.client.get('/api/events/college_leaderboard/').data, [{"college": "Tkm", "points": 5}])
+
+        self.client.patch(f'/api/participants/{self.third.id}/', {'is_winner': False}, format='json')
+        self.assertEqual(self.client.get('/api/events/college_leaderboard/').data, [])
+
+class RegistrationExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(username="admin", password="x"))
+        self.fest = Fest.objects.create(name="NEURA", year=2026)
+        self.event = Event.objects.create(
+            fest=self.fest, title="Quiz", description="", date=timezone.now() + timedelta(days=1),
+            custom_fields=["T-Shirt Size"]
+        )
+        Participant.objects.create(
+            event=self.event, name="Asha", email="a@x.com", phone="1", college="MEC",
+            custom_responses={"T-Shirt Size": "M"}
+        )
+
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_event_export_with_custom_fields(self):
+        lines = self.read_csv(self.client.get(f'/api/events/{self.event.id}/export_registrations/?custom_fields=1'))
+        self.assertTrue(lines[0].endswith('Payment Ref,T-Shirt Size'))
+        self.assertTrue(lines[1].endswith(',Asha,N/A,a@x.com,1,MEC,No,1,-,No,N/A,M'))
+
+    def test_non_dict_custom_responses_export_blank(self):
+        Participant.objects.create(
+            event=self.event, name="Ravi", email="r@x.com", phone="2", college="MEC", custom_responses=["M"]
+        )
+        lines = self.read_csv(self.client.get(f'/api/events/{self.event.id}/export_registrations/?custom_fields=1'))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].endswith(',Ravi,N/A,r@x.com,2,MEC,No,1,-,No,N/A,'))
+
+    def test_fest_export_includes_event_column(self):
+        lines = self.read_csv(self.client.get(f'/api/fests/{self.fest.id}/export_registrations/'))
+        self.assertTrue(lines[0].endswith('Payment Ref,Event'))
+        self.assertTrue(lines[1].endswith(',N/A,Quiz'))
+
+class RegistrationCapacityStressTest(TransactionTestCase):
+    ATTEMPTS = 300
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Hackathon", description="", date=timezone.now() + timedelta(days=1),
+            max_participants=100
+        )
+
+    def register(self, i):
+        try:
+            return APIClient().post('/api/participants/', {
+                'event': self.event.id, 'name': f"P{i}", 'email': f"p{i}@x.com",
+                'phone': str(i), 'college': "MEC"
+            }, format='json').status_code
+        finally:
+            connections.close_all()
+
+    def test_parallel_registrations_never_overbook(self):
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            codes = list(pool.map(self.register, range(self.ATTEMPTS)))
+
+        self.assertEqual(codes.count(201), 100)
+        self.assertEqual(codes.count(400), self.ATTEMPTS - 100)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 100)
+        self.assertEqual(self.event.registrations.count(), 100)
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.event = Event.objects.create(title="Quiz", description="", date=timezone.now() + timedelta(days=1))
+
+    def test_anonymous_reads_are_cached_with_etag(self):
+        first = self.client.get('/api/events/')
+        etag = first['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get('/api/events/')
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(second.content, first.content)
+
+        not_modified = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_model_changes_invalidate_cached_responses(self):
+        self.client.get(f'/api/events/{self.event.id}/qualifiers/')
+        Participant.objects.create(event=self.event, name="Asha", email="a@x.com", phone="1", college="MEC")
+        response = self.client.get(f'/api/events/{self.event.id}/qualifiers/')
+        self.assertEqual([p['name'] for p in response.json()], ["Asha"])
+
+        self.event.title = "Quiz Finals"
+        self.event.save()
+        self.assertEqual(self.client.get(f'/api/events/{self.event.id}/').json()['title'], "Quiz Finals")
+
+    def test_authenticated_reads_bypass_cache(self):
+        self.client.get('/api/events/')
+        self.client.force_authenticate(User.objects.create_user(username="coord"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/events/')
+        self.assertGreater(len(ctx.captured_queries), 0)
+        self.assertNotIn('ETag', response)
+
+class CheckInTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coordinator = User.objects.create_user(username="coord")
+        event = Event.objects.create(
+            title="Quiz", description="", coordinator=self.coordinator,
+            date=timezone.now() + timedelta(days=1)
+        )
+        other_event = Event.objects.create(title="Other", description="", date=timezone.now() + timedelta(days=1))
+        self.mine = [
+            Participant.objects.create(event=event, name=f"P{i}", email=f"p{i}@x.com", phone="1", college="MEC")
+            for i in range(3)
+        ]
+        self.foreign = Participant.objects.create(event=other_event, name="X", email="x@x.com", phone="1", college="MEC")
+        self.client.force_authenticate(self.coordinator)
+
+    def check_in(self, participant):
+        return self.client.post('/api/participants/check_in/', {'qr_data': qr_token(participant.id)})
+
+    def test_check_in_duplicate_and_foreign_event(self):
+        response = self.check_in(self.mine[0])
+        self.assertEqual(response.data['status'], "success")
+        self.assertEqual(self.check_in(self.mine[0]).data['status'], "duplicate")
+        self.assertEqual(self.check_in(self.foreign).status_code, 404)
+        self.foreign.refresh_from_db()
+        self.assertFalse(self.foreign.attended)
+
+    def test_batch_reports_each_scan(self):
+        self.check_in(self.mine[0])
+        scans = [qr_token(p.id) for p in self.mine] + [qr_token(self.mine[1].id), qr_token(self.foreign.id), "garbage"]
+        data = self.client.post('/api/participants/check_in_batch/', {'scans': scans}, format='json').data
+        self.assertEqual(data['checked_in'], [self.mine[1].id, self.mine[2].id])
+        self.assertEqual(data['duplicates'], [self.mine[0].id, self.mine[1].id])
+        self.assertEqual(data['not_found'], [self.foreign.id])
+        self.assertEqual(data['invalid'], ["garbage"])
+        self.assertEqual(Participant.objects.filter(attended=True).count(), 3)
+
+class AnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.fest = Fest.objects.create(name="NEURA", year=2026)
+        self.event = Event.objects.create(fest=self.fest, title="Quiz", description="", date=timezone.now() + timedelta(days=1))
+        other = Event.objects.create(fest=self.fest, title="Hackathon", description="", date=timezone.now() + timedelta(days=1))
+        Participant.objects.create(event=self.event, name="A", email="a@x.com", phone="1", college="MEC", attended=True, current_round=2)
+        Participant.objects.create(event=self.event, name="B", email="b@x.com", phone="2", college=" mec", is_winner=True, rank=1)
+        Participant.objects.create(event=other, name="C", email="c@x.com", phone="3", college="CET")
+        Feedback.objects.create(event=self.event, name="A", message="Great", rating=4)
+        Feedback.objects.create(event=self.event, name="B", message="Good", rating=2)
+
+    def test_event_analytics(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(f'/api/events/{self.event.id}/analytics/').data
+        # event lookup + participant GROUP BY + feedback aggregate
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(data['total_registrations'], 2)
+        self.assertEqual(data['attendance_rate'], 50)
+        self.assertEqual(data['winners'], 1)
+        self.assertEqual(data['average_rating'], 3)
+        self.assertEqual(data['round_distribution'], [{"round": 1, "count": 1}, {"round": 2, "count": 1}])
+        self.assertEqual(data['college_distribution'], [{"college": "Mec", "count": 2}])
+
+    def test_fest_analytics(self):
+        self.assertEqual(self.client.get(f'/api/fests/{self.fest.id}/analytics/').status_code, 401)
+        self.client.force_authenticate(User.objects.create_user(username="student"))
+        self.assertEqual(self.client.get(f'/api/fests/{self.fest.id}/analytics/').status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_superuser(username="analytics_admin", password="x"))
+        data = self.client.get(f'/api/fests/{self.fest.id}/analytics/').data
+        self.assertEqual(data['total_registrations'], 3)
+        self.assertEqual(data['event_distribution'][0], {"event": self.event.id, "count": 2})
+
+class DashboardDataTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.coordinator = User.objects.create_user(username="coord")
+        self.event = Event.objects.create(
+            title="Quiz", description="", coordinator=self.coordinator,
+            date=timezone.now() + timedelta(days=1), max_participants=500
+        )
+        Participant.objects.bulk_create([
+            Participant(
+                event=self.event, name=f"P{i:03}", email=f"p{i}@x.com", phone="1",
+                college="MEC" if i % 2 else "CET", college_key="Mec" if i % 2 else "Cet",
+                current_round=1 + i % 3, attended=i % 4 == 0
+            )
+            for i in range(120)
+        ])
+        self.client.force_authenticate(self.coordinator)
+
+    def test_first_page_is_one_small_query(self):
+        url = f'/api/events/{self.event.id}/dashboard_data/'
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(url).data
+        # event + rounds + one page of participants
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(len(data['participants']), 50)
+        self.assertNotIn('custom_responses', data['participants'][0])
+
+        seen = [row['id'] for row in data['participants']]
+        while data['next']:
+            data = self.client.get(data['next']).data
+            seen += [row['id'] for row in data['participants']]
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(len(set(seen)), 120)
+
+    def test_filters_and_ordering(self):
+        url = f'/api/events/{self.event.id}/dashboard_data/'
+        data = self.client.get(url, {'round': 2, 'college': 'mec', 'ordering': 'name'}).data
+        rows = data['participants']
+        self.assertTrue(rows)
+        self.assertTrue(all(r['current_round'] == 2 and r['college_key'] == "Mec" for r in rows))
+        self.assertEqual([r['name'] for r in rows], sorted(r['name'] for r in rows))
+
+        attended = self.client.get(url, {'attended': 'true', 'page_size': 500}).data['participants']
+        self.assertEqual(len(attended), 30)
+
+    def test_every_ordering_pages_through_all_rows(self):
+        Participant.objects.filter(name__in=["P001", "P002"]).update(is_winner=True, rank=1)
+        url = f'/api/events/{self.event.id}/dashboard_data/'
+        for ordering in ('registered_at', 'name', 'college_key', 'current_round', 'rank', 'attended'):
+            for direction in ('', '-'):
+                data = self.client.get(url, {'ordering': direction + ordering, 'page_size': 7}).data
+                seen = [row['id'] for row in data['participants']]
+                while data['next']:
+                    response = self.client.get(data['next'])
+                    self.assertEqual(response.status_code, 200)
+                    data = response.data
+                    seen += [row['id'] for row in data['participants']]
+                self.assertEqual(len(set(seen)), 120, direction + ordering)
+                self.assertEqual(len(seen), 120, direction + ordering)
+
+class ParticipantQueryPlanTest(TestCase):
+    """
+    EXPLAINs the participant queries behind the hot endpoints on a seeded
+    table and fails if any of them falls back to a full table scan.
+    """
+    EVENTS = 40
+    PER_EVENT = 250
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student@x.com")
+        events = Event.objects.bulk_create([
+            Event(title=f"Event {i}", description="", date=timezone.now() + timedelta(days=1))
+            for i in range(cls.EVENTS)
+        ])
+        cls.event = events[0]
+        Participant.objects.bulk_create([
+            Participant(
+                event=event, name=f"P{e}-{i}", email=f"p{e}.{i}@x.com", phone=f"9{e:03}{i:05}",
+                college=f"College {i % 50}", college_key=f"College {i % 50}",
+                current_round=1 + (i % 20 == 0), attended=i % 50 == 0,
+                is_winner=i < 3, rank=i + 1 if i < 3 else None,
+                user=cls.user if e == 0 and i == 0 else None
+            )
+            for e, event in enumerate(events) for i in range(cls.PER_EVENT)
+        ], batch_size=1000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def hot_queries(self):
+        event = self.event
+        credential = "p0.7@x.com"
+        return {
+            'qualifiers': event.registrations.order_by('-current_round', 'name'),
+            'eligible_students': event.registrations.filter(current_round__gt=1).order_by('-current_round', 'name'),
+            'results': event.registrations.filter(is_winner=True).order_by('rank'),
+            'college_leaderboard': Participant.objects.filter(is_winner=True)
+                .values('college_key').annotate(points=Sum(RANK_POINTS)),
+            'generate_certificates': event.registrations.filter(attended=True).order_by('id'),
+            'dashboard_round': event.registrations.filter(current_round=2),
+            'check_in': Participant.objects.filter(id=5, attended=False),
+            'me': Participant.objects.filter(user=self.user),
+            'student_login': registrations_for(credential)[:1],
+        }
+
+    def full_scans(self, plan):
+        if connection.vendor == 'postgresql':
+            return re.findall(r'Seq Scan on api_participant\b', plan)
+        # SQLite: "SCAN api_participant" without an index is a table scan
+        return re.findall(r'SCAN api_participant\b(?! USING)', plan)
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Seq scans stay possible but only win when no index applies
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(endpoint=name):
+                plan = queryset.explain()
+                self.assertEqual(self.full_scans(plan), [], f"{name} plan:\n{plan}")
+
+class BenchmarkHarnessTest(TestCase):
+    def test_seed_and_run_smoke(self):
+        call_command('seed_fest', events=2, participants=20, feedback=2, stdout=io.StringIO())
+        output = tempfile.NamedTemporaryFile(suffix='.json', delete=False).name
+        call_command('run_benchmarks', iterations=2, output=output, stdout=io.StringIO(),
+                     only=['events_list', 'qualifiers', 'scan_qr'])
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(set(results['scenarios']), {'events_list', 'qualifiers', 'scan_qr'})
+        for scenario in results['scenarios'].values():
+            self.assertEqual(sum(scenario['status_codes'].values()), 2)
+            self.assertIn('p99', scenario['latency_ms'])
+            self.assertIsNotNone(scenario['queries'])
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        metrics_registry.reset()
+        caches['responses'].clear()
+        self.admin = User.objects.create_superuser(username="metrics_admin", password="pw")
+        self.event = Event.objects.create(title="Metered", date=timezone.now() + timedelta(days=1))
+        self.client = APIClient()
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_records_route_latency_and_queries(self):
+        self.client.get(f'/api/events/{self.event.id}/')
+        self.client.force_authenticate(self.admin)
+        body = self.client.get('/api/metrics/').content.decode()
+
+        self.assertIn('http_requests_total{route="event-detail",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{route="event-detail",method="GET"} 1', body)
+        self.assertRegex(body, r'http_request_db_queries_total\{route="event-detail",method="GET"\} [1-9]')
+
+    def test_disabled_sampling_records_nothing(self):
+        self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(metrics_registry.requests, {})
+
+    def test_endpoint_is_admin_only(self):
+        self.assertIn(self.client.get('/api/metrics/').status_code, (401, 403))
+
+    def test_repeated_sql_shapes_flag_n_plus_one(self):
+        recorder = QueryRecorder()
+        for pk in range(12):
+            recorder.shapes[f'SELECT * FROM "api_event" WHERE "id" = {pk}'] += 1
+        recorder.shapes['SELECT 1'] += 1
+        self.assertEqual(recorder.repeated_shapes(10), [('SELECT * FROM "api_event" WHERE "id" = ?', 12)])
+
+class BulkResultsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+        self.coordinator = User.objects.create_user(username="judge_coord", password="x")
+        self.event = Event.objects.create(title="Hackathon", date=timezone.now() + timedelta(days=1), coordinator=self.coordinator)
+        EventRound.objects.create(event=self.event, round_number=1, name="Prelims", selection_limit=3)
+        EventRound.objects.create(event=self.event, round_number=2, name="Finals", selection_limit=2)
+        self.p = [
+            Participant.objects.create(event=self.event, name=f"P{i}", email=f"p{i}@x.com", phone=str(i), college="MEC")
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.coordinator)
+
+    def promote(self, participants, next_round=2):
+        return self.client.post('/api/participants/promote/', {
+            'ids': [p.id for p in participants], 'next_round': next_round
+        }, format='json')
+
+    def rank(self, *entries):
+        return self.client.post(f'/api/events/{self.event.id}/rankings/', {
+            'rankings': [{'id': p.id, 'rank': r} for p, r in entries]
+        }, format='json')
+
+    def test_promote_enforces_selection_limit_and_scope(self):
+        self.assertEqual(self.promote(self.p[:4]).status_code, 400)
+        self.assertEqual(self.promote(self.p[:3]).status_code, 200)
+        self.assertEqual(self.promote(self.p[3:4]).status_code, 400)
+        self.assertEqual(self.promote(self.p[:1], next_round=3).status_code, 400)
+        self.assertEqual(self.promote(self.p[:1], next_round=-1).status_code, 400)
+        self.assertEqual(self.promote(self.p[:1], next_round="0").status_code, 400)
+
+        other = Event.objects.create(title="Other", date=timezone.now() + timedelta(days=1))
+        foreign = Participant.objects.create(event=other, name="F", email="f@x.com", phone="9", college="MEC")
+        self.assertEqual(self.promote([foreign]).status_code, 400)
+        self.assertEqual(Participant.objects.filter(current_round=2).count(), 3)
+
+    def test_rankings_validate_against_final_round(self):
+        self.promote(self.p[:3])
+        self.assertEqual(self.rank((self.p[0], 1), (self.p[1], 2), (self.p[2], 3)).status_code, 400)
+        self.assertEqual(self.rank((self.p[0], 1), (self.p[4], 2)).status_code, 400)
+        self.assertEqual(self.rank((self.p[1], 2), (self.p[0], 1)).status_code, 400)
+        self.assertFalse(Participant.objects.filter(is_winner=True).exists())
+
+    def test_rankings_replace_previous_results_in_bulk(self):
+        self.promote(self.p[:3])
+        self.assertEqual(self.rank((self.p[0], 1), (self.p[1], 2)).status_code, 200)
+        self.assertEqual(self.client.get('/api/events/college_leaderboard/').data, [{"college": "Mec", "points": 15}])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.rank((self.p[2], 1), (self.p[0], 3))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum('UPDATE' in q['sql'] for q in ctx.captured_queries), 1)
+
+        winners = list(Participant.objects.filter(is_winner=True).order_by('rank').values_list('name', 'rank'))
+        self.assertEqual(winners, [("P2", 1), ("P0", 3)])
+        self.assertEqual(self.client.get('/api/events/college_leaderboard/').data, [{"college": "Mec", "points": 13}])
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(f'/api/events/{self.event.id}/rankings/', {}, format='json').status_code, 401)
+
+class AsyncUrls:
+    # config/urls.py as built with DJANGO_SERVER_MODE=asgi
+    from config.urls import router
+    urlpatterns = [path('api/', include(live_urlpatterns + async_urlpatterns(router.urls) + router.urls))]
+
+class AsyncPublicViewsTest(TestCase):
+    PATHS = (
+        '/api/events/', '/api/events/?fest={fest}&is_team_event=false&search=quiz',
+        '/api/events/?page=2', '/api/events/college_leaderboard/', '/api/fests/',
+        '/api/events/{event}/qualifiers/', '/api/events/{event}/results/',
+        '/api/events/{hidden}/results/', '/api/events/999999/qualifiers/', '/api/events/?fest=999999',
+    )
+
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+        fest = Fest.objects.create(name="NEURA", year=2026)
+        Schedule.objects.create(fest=fest, title="Opening", start_time=timezone.now(), location="Main Hall")
+        for i in range(12):
+            event = Event.objects.create(
+                fest=fest, title=f"Quiz {i}", date=timezone.now() + timedelta(days=i + 1), results_published=i == 0
+            )
+            EventRound.objects.create(event=event, round_number=1, name="Prelims")
+            Participant.objects.create(event=event, name="A", email=f"a{i}@x.com", phone=str(i), college="MEC",
+                                       is_winner=True, rank=1)
+        events = Event.objects.order_by('date')
+        self.ids = {'fest': fest.id, 'event': events[0].id, 'hidden': events[1].id}
+
+    async def test_async_views_match_drf_views(self):
+        for template in self.PATHS:
+            url = template.format(**self.ids)
+            expected = await sync_to_async(self.client.get)(url)
+            await caches['responses'].aclear()
+            with self.settings(ROOT_URLCONF=AsyncUrls):
+                actual = await self.async_client.get(url)
+            self.assertEqual(actual.status_code, expected.status_code, url)
+            self.assertEqual(actual.json(), expected.json(), url)
+            await caches['responses'].aclear()
+
+    async def test_writes_and_authenticated_reads_fall_back_to_drf(self):
+        with self.settings(ROOT_URLCONF=AsyncUrls):
+            response = await self.async_client.post('/api/events/', {}, content_type='application/json')
+            self.assertEqual(response.status_code, 401)
+            response = await self.async_client.get('/api/fests/', headers={'Authorization': 'Bearer junk'})
+            self.assertEqual(response.status_code, 401)
+
+@override_settings(SERVER_MODE='asgi')
+class LiveUpdatesTest(TestCase):
+    def setUp(self):
+        self.coordinator = User.objects.create_user(username="live_coord", password="x")
+        self.event = Event.objects.create(title="Live Quiz", date=timezone.now() + timedelta(days=1), coordinator=self.coordinator)
+        self.participant = Participant.objects.create(event=self.event, name="A", email="a@x.com", phone="1", college="MEC")
+        self.client = APIClient()
+        self.client.force_authenticate(self.coordinator)
+
+    def committed(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format='json')
+
+    async def test_state_changes_are_pushed_as_diffs(self):
+        subscription = get_broker().subscribe(event_channel(self.event.id))
+        try:
+            await sync_to_async(self.committed)('post', '/api/participants/promote/', {'ids': [self.participant.id], 'next_round': 2})
+            await sync_to_async(self.committed)('patch', f'/api/participants/{self.participant.id}/toggle_attendance/')
+            await sync_to_async(self.committed)('patch', f'/api/participants/{self.participant.id}/assign_rank/', {'rank': 1})
+            changes = [(await subscription.get(timeout=1))['changes'] for _ in range(3)]
+        finally:
+            subscription.close()
+        pk = self.participant.id
+        self.assertEqual(changes, [
+            [{"id": pk, "current_round": 2}],
+            [{"id": pk, "attended": True}],
+            [{"id": pk, "rank": 1, "is_winner": True}],
+        ])
+        self.assertEqual(get_broker().subscriber_count(event_channel(self.event.id)), 0)
+
+    async def test_sse_stream(self):
+        with self.settings(ROOT_URLCONF=AsyncUrls):
+            response = await self.async_client.get(f'/api/events/{self.event.id}/live/')
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            stream = aiter(response.streaming_content)
+            self.assertIn(b'event: ready', await anext(stream))
+
+            get_broker().publish(event_channel(self.event.id), {"type": "participants", "changes": [{"id": 1}]})
+            chunk = (await anext(stream)).decode()
+            self.assertTrue(chunk.startswith('id: '))
+            self.assertIn('event: participants', chunk)
+            self.assertIn('"changes": [{"id": 1}]', chunk)
+            await stream.aclose()
+
+            self.assertEqual((await self.async_client.get('/api/events/999999/live/')).status_code, 404)
+
+    async def test_database_broker_reaches_other_processes(self):
+        publisher, spectator = DatabaseBroker(background=False), DatabaseBroker(background=False)
+        channel = event_channel(self.event.id)
+        subscription = spectator.subscribe(channel)
+        try:
+            await sync_to_async(publisher.publish)(channel, {"type": "participants", "changes": [{"id": 1}]})
+            await sync_to_async(spectator.poll)()
+            await sync_to_async(spectator.poll)()
+            message = await subscription.get(timeout=1)
+            self.assertEqual(message['changes'], [{"id": 1}])
+            self.assertEqual(message['id'], await sync_to_async(lambda: LiveMessage.objects.get().id)())
+            self.assertIsNone(await subscription.get(timeout=0.1))
+        finally:
+            subscription.close()
+
+    def test_database_broker_prunes_on_publish(self):
+        channel = event_channel(self.event.id)
+        old = LiveMessage.objects.create(channel=channel, payload={})
+        LiveMessage.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(seconds=settings.LIVE_MESSAGE_TTL + 1))
+        DatabaseBroker(background=False).publish(channel, {"type": "participants", "changes": []})
+        self.assertEqual(LiveMessage.objects.exclude(pk=old.pk).count(), 1)
+        self.assertFalse(LiveMessage.objects.filter(pk=old.pk).exists())
+
+    @override_settings(SERVER_MODE='wsgi')
+    def test_nothing_is_published_without_asgi(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.patch(f'/api/participants/{self.participant.id}/toggle_attendance/')
+        self.assertEqual(callbacks, [])
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageRenditionTest(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser(username="photo_admin", password="x"))
+
+    def photo(self, name, size=(2400, 1600)):
+        # Noise compresses badly, like a real phone photo
+        image = PILImage.frombytes('RGB', size, random.Random(1).randbytes(size[0] * size[1] * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=95)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def upload(self, method, url, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, {'title': "Day 1", 'image': self.photo(name)}, format='multipart')
+        self.assertIn(response.status_code, (200, 201))
+        return response.json()
+
+    def test_upload_generates_renditions_off_request_path(self):
+        created = self.upload('post', '/api/gallery/', 'stage.jpg')
+        self.assertIsNone(created['image_renditions'])
+        self.assertEqual(Task.objects.get().name, 'generate_renditions')
+
+        DatabaseBackend().run_pending()
+        gallery = Gallery.objects.get()
+        entry = gallery.renditions['image']
+        self.assertEqual(set(entry), {'source', 'thumb', 'thumb_webp', 'medium', 'medium_webp'})
+        with default_storage.open(entry['thumb_webp']) as f:
+            self.assertEqual(PILImage.open(f).size, (320, 213))
+        self.assertLess(default_storage.size(entry['thumb']) * 10, gallery.image.size)
+
+        self.client.force_authenticate(None)
+        urls = self.client.get('/api/gallery/').json()['results'][0]['image_renditions']
+        self.assertTrue(urls['thumb_webp'].endswith('gallery/renditions/stage_thumb.webp'))
+
+    def test_replacing_the_image_regenerates_and_removes_old_files(self):
+        created = self.upload('post', '/api/gallery/', 'old.jpg')
+        DatabaseBackend().run_pending()
+        old_thumb = Gallery.objects.get().renditions['image']['thumb']
+
+        updated = self.upload('patch', f"/api/gallery/{created['id']}/", 'new.jpg')
+        self.assertIsNone(updated['image_renditions'])
+        DatabaseBackend().run_pending()
+        self.assertFalse(default_storage.exists(old_thumb))
+        self.assertIn('new_thumb', Gallery.objects.get().renditions['image']['thumb'])
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_PARTIAL_DIR=tempfile.mkdtemp(), UPLOAD_CHUNK_SIZE=1000)
+class ChunkedUploadTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.event = Event.objects.create(title="Paid Workshop", date=timezone.now() + timedelta(days=1), registration_fee=100)
+        buffer = io.BytesIO()
+        PILImage.frombytes('RGB', (60, 60), random.Random(2).randbytes(60 * 60 * 3)).save(buffer, 'PNG')
+        self.png = buffer.getvalue()
+
+    def declare(self, size, purpose='payment_proof', content_type='image/png'):
+        response = self.client.post('/api/uploads/', {
+            'purpose': purpose, 'filename': 'proof.png', 'content_type': content_type, 'size': size
+        }, format='json')
+        return response
+
+    def put(self, token, data, start, total):
+        return self.client.generic('PUT', f'/api/uploads/{token}/', data, content_type='application/octet-stream',
+                                   HTTP_CONTENT_RANGE=f'bytes {start}-{start + len(data) - 1}/{total}')
+
+    def upload(self, data):
+        token = self.declare(len(data)).json()['token']
+        for start in range(0, len(data), 1000):
+            response = self.put(token, data[start:start + 1000], start, len(data))
+            self.assertEqual(response.status_code, 200, response.content)
+        return token, response.json()
+
+    def test_resumable_upload_then_register_by_token(self):
+        total = len(self.png)
+        token = self.declare(total).json()['token']
+        self.put(token, self.png[:1000], 0, total)
+        self.assertEqual(self.put(token, self.png[2000:3000], 2000, total).status_code, 409)
+        self.assertEqual(self.put(token, self.png[:1000], 0, total).status_code, 200)  # retried chunk
+        self.assertEqual(self.client.get(f'/api/uploads/{token}/').json()['received'], 1000)
+
+        for start in range(1000, total, 1000):
+            response = self.put(token, self.png[start:start + 1000], start, total)
+        self.assertTrue(response.json()['is_complete'])
+
+        registration = {'event': self.event.id, 'name': "Asha", 'email': "asha@x.com", 'phone': "1",
+                        'college': "MEC", 'payment_proof_upload': token}
+        response = self.client.post('/api/participants/', registration, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        participant = Participant.objects.get()
+        self.assertTrue(participant.payment_proof.name.startswith('payment_proofs/'))
+        with participant.payment_proof.open('rb') as f:
+            self.assertEqual(f.read(), self.png)
+
+        registration['email'] = "other@x.com"
+        self.assertEqual(self.client.post('/api/participants/', registration, format='json').status_code, 400)
+
+    def test_rejects_invalid_declarations_and_contents(self):
+        self.assertEqual(self.declare(10, content_type='application/pdf').status_code, 400)
+        self.assertEqual(self.declare(10 ** 9).status_code, 400)
+        self.assertEqual(self.declare(10, purpose='event_pdf', content_type='application/pdf').status_code, 401)
+
+        token = self.declare(1500).json()['token']
+        self.put(token, b'x' * 1000, 0, 1500)
+        response = self.put(token, b'x' * 500, 1000, 1500)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received'], 0)
+
+    def test_user_uploads_are_private_to_them(self):
+        owner = User.objects.create_user(username="owner")
+        self.client.force_authenticate(owner)
+        token, _ = self.upload(self.png)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(f'/api/uploads/{token}/').status_code, 404)
+        response = self.client.post('/api/participants/', {
+            'event': self.event.id, 'name': "X", 'email': "x@x.com", 'phone': "1", 'college': "MEC",
+            'payment_proof_upload': token
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+class StudentLoginTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.event = Event.objects.create(title="Hackathon", date=timezone.now() + timedelta(days=1))
+        self.other = Event.objects.create(title="Quiz", date=timezone.now() + timedelta(days=1))
+
+    def register(self, event, email, phone="9000000001"):
+        return Participant.objects.create(event=event, name="Asha", email=email, phone=phone, college="MEC")
+
+    def login(self, credential):
+        return self.client.post('/api/student-login/', {'credential': credential}, format='json')
+
+    def test_registrations_share_one_account_linked_at_registration(self):
+        first = self.register(self.event, "Asha@X.com")
+        second = self.register(self.other, "asha@x.com ")
+        self.assertIsNotNone(first.user_id)
+        self.assertEqual(first.user_id, second.user_id)
+        self.assertEqual(first.user.username, "asha@x.com")
+        self.assertFalse(first.user.has_usable_password())
+
+    def test_login_is_one_query_then_cached(self):
+        participant = self.register(self.event, "asha@x.com")
+        with self.assertNumQueries(1):
+            response = self.login("ASHA@x.com")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['id'], participant.user_id)
+        self.assertEqual(self.login("9000000001").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.login("9000000001").status_code, 200)
+            self.assertEqual(self.login(" asha@x.com").status_code, 200)
+
+        # A changed registration drops the cached resolution
+        participant.phone = "9000000002"
+        participant.save()
+        self.assertEqual(self.login("9000000001").status_code, 404)
+
+    def test_links_legacy_registrations_on_login(self):
+        participant = self.register(self.event, "asha@x.com")
+        Participant.objects.filter(pk=participant.pk).update(user=None)
+        response = self.login("asha@x.com")
+        self.assertEqual(response.status_code, 200)
+        participant.refresh_from_db()
+        self.assertEqual(participant.user_id, response.json()['user']['id'])
+
+    def test_long_emails_get_a_bounded_username(self):
+        email = f"{'a' * 200}@x.com"
+        participant = self.register(self.event, email.upper())
+        self.assertLessEqual(len(participant.user.username), 150)
+        self.assertEqual(participant.user.email, email.upper())
+        self.assertEqual(self.register(self.other, email).user_id, participant.user_id)
+        self.assertEqual(get_student_users([email])[student_username(email)], participant.user)
+        self.assertEqual(self.login(email).json()['user']['id'], participant.user_id)
+
+    def test_staff_email_cannot_log_in_as_student(self):
+        User.objects.create_user(username="coord@x.com", is_staff=True)
+        participant = self.register(self.event, "coord@x.com")
+        self.assertIsNone(participant.user)
+        self.assertEqual(self.login("coord@x.com").status_code, 403)
+
+class FieldSelectionTest(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.admin = User.objects.create_superuser(username="fields_admin", password="pw")
+        self.fest = Fest.objects.create(name="NEURA", year=2026)
+        for i in range(3):
+            Schedule.objects.create(fest=self.fest, title=f"Slot {i}", start_time=timezone.now(), location="Main Hall")
+        self.events = [
+            Event.objects.create(fest=self.fest, title=f"Event {i}", date=timezone.now() + timedelta(days=1))
+            for i in range(3)
+        ]
+        for event in self.events:
+            for i in range(2):
+                Participant.objects.create(event=event, name=f"P{i}", email=f"p{i}.{event.id}@x.com",
+                                           phone=str(i), college="MEC", custom_responses={"Size": "M"})
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_fields_narrow_response_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/participants/?fields=id,name,event_title')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'name', 'event_title'})
+        select = ctx.captured_queries[-1]['sql']
+        self.assertIn('"api_event"."title"', select)  # joined, not one query per row
+        self.assertNotIn('custom_responses', select)
+        self.assertNotIn('"api_event"."description"', select)
+
+    def test_expand_and_omit(self):
+        response = self.client.get('/api/participants/?expand=event&omit=email,event.image')
+        row = response.json()['results'][0]
+        self.assertNotIn('email', row)
+        self.assertEqual(set(row['event']), {'id', 'title', 'date', 'location'})
+
+        with self.assertNumQueries(2):  # count + page, event joined
+            response = self.client.get('/api/participants/?fields=id,event.title,event.fest&expand=event,event.fest')
+        self.assertEqual(response.json()['results'][0]['event']['fest'], {'id': self.fest.id, 'name': "NEURA", 'year': 2026})
+
+        with self.assertNumQueries(2):  # registration_count reads seats_taken, not a COUNT per row
+            response = self.client.get('/api/participants/?fields=id,event.registration_count&expand=event')
+        self.assertEqual(response.json()['results'][0]['event'], {'registration_count': 2})
+
+        # Selection only shapes reads
+        response = self.client.post('/api/participants/?fields=id', {
+            'event': self.events[0].id, 'name': "New", 'email': "new@x.com", 'phone': "9", 'college': "MEC"
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('email', response.json())
+
+    def test_nested_lists_are_prefetched_and_selectable(self):
+        self.client.force_authenticate(None)
+        with self.assertNumQueries(3):  # count, fests, schedules
+            response = self.client.get('/api/fests/?fields=id,schedules.title')
+        self.assertEqual(response.json()['results'][0], {
+            'id': self.fest.id, 'schedules': [{'title': f"Slot {i}"} for i in range(3)]
+        })
+        response = self.client.get('/api/fests/?omit=schedules')
+        self.assertNotIn('schedules', response.json()['results'][0])
+
+class FestBundleTest(TestCase):
+    def setUp(self):
+        self.fest = Fest.objects.create(name="NEURA", year=2026)
+        self.event = Event.objects.create(fest=self.fest, title="Hackathon", date=timezone.now() + timedelta(days=3))
+        EventRound.objects.create(event=self.event, round_number=1, name="Prelims", selection_limit=10)
+        Schedule.objects.create(fest=self.fest, title="Opening", start_time=timezone.now(), location="Main Hall")
+        TeamMember.objects.create(name="Asha", role="Lead")
+        self.url = f'/api/fests/{self.fest.id}/bundle/'
+        self.client = APIClient()
+
+    def test_serves_precompressed_snapshot_with_strong_etag(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        bundle = json.loads(gzip.decompress(response.content))
+        self.assertEqual(bundle['version'], 1)
+        self.assertEqual(bundle['fest']['name'], "NEURA")
+        self.assertEqual([e['title'] for e in bundle['events']], ["Hackathon"])
+        self.assertEqual(bundle['events'][0]['rounds'][0]['name'], "Prelims")
+        self.assertEqual([s['title'] for s in bundle['schedules']], ["Opening"])
+        self.assertEqual(len(bundle['team']), 1)
+        self.assertNotIn('seats_taken', bundle['events'][0])
+
+        with self.assertNumQueries(1):
+            plain = self.client.get(self.url)
+        self.assertEqual(json.loads(plain.content), bundle)
+        self.assertNotEqual(plain['ETag'], response['ETag'])
+        self.assertFalse(plain['ETag'].startswith('W/'))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=plain['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/fests/999/bundle/').status_code, 404)
+
+    def test_changes_rebuild_only_affected_sections(self):
+        etag = self.client.get(self.url)['ETag']
+        Schedule.objects.create(fest=self.fest, title="Closing", start_time=timezone.now() + timedelta(hours=5), location="Main Hall")
+        other = Fest.objects.create(name="Other", year=2025)
+        Event.objects.create(fest=other, title="Elsewhere", date=timezone.now() + timedelta(days=3))
+        self.assertEqual(FestSnapshot.objects.get(fest=self.fest).stale, ['schedules'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('"api_event"' in q['sql'] for q in ctx.captured_queries))
+        bundle = json.loads(response.content)
+        self.assertEqual(bundle['version'], 2)
+        self.assertEqual([s['title'] for s in bundle['schedules']], ["Opening", "Closing"])
+
+        Gallery.objects.create(title="Stage", image="gallery/stage.jpg")
+        self.assertEqual(FestSnapshot.objects.get(fest=self.fest).stale, ['gallery'])
+
+    def test_events_expire_when_registration_closes(self):
+        self.client.get(self.url)
+        snapshot = FestSnapshot.objects.get(fest=self.fest)
+        self.assertEqual(snapshot.expires_at, self.event.date)
+
+        Event.objects.filter(pk=self.event.pk).update(date=timezone.now() - timedelta(hours=1))
+        FestSnapshot.objects.filter(pk=snapshot.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        bundle = json.loads(self.client.get(self.url).content)
+        self.assertFalse(bundle['events'][0]['is_registration_open'])
+        self.assertIsNone(FestSnapshot.objects.get(fest=self.fest).expires_at)
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        self.coordinator = User.objects.create_user(username="import_coord")
+        self.event = Event.objects.create(
+            title="Codeathon", date=timezone.now() + timedelta(days=2), coordinator=self.coordinator,
+            max_participants=4, custom_fields=["T-Shirt Size"],
+        )
+        Participant.objects.create(event=self.event, name="Existing", email="taken@x.com", phone="1", college="MEC",
+                                   custom_responses={"T-Shirt Size": "M"})
+        self.client = APIClient()
+        self.client.force_authenticate(self.coordinator)
+
+    def upload(self, lines, query=''):
+        sheet = SimpleUploadedFile("students.csv", "\n".join(lines).encode(), content_type='text/csv')
+        return self.client.post(f'/api/events/{self.event.id}/import_registrations/{query}', {'file': sheet}, format='multipart')
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        lines = [
+            "Name,Email,Phone,College,T-Shirt Size",
+            "Asha,asha@x.com,9000000001,mec,S",
+            "Ravi,not-an-email,9000000002,MEC,M",
+            ",meera@x.com,9000000003,MEC,L",
+            "",
+            "Asha Again,ASHA@x.com,9000000004,MEC,S",
+            "Old,taken@x.com,9000000005,MEC,M",
+            "Nikhil,nikhil@x.com,9000000006,TKM,",
+            "Arjun,arjun@x.com,9000000007,TKM,XL",
+            "Sneha,sneha@x.com,9000000008,TKM,XL",
+            "Rahul,rahul@x.com,9000000009,TKM,XL",
+        ]
+        preview = self.upload(lines, '?dry_run=1').json()
+        self.assertEqual((preview['valid'], preview['created']), (3, 0))
+        self.assertEqual(Participant.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(lines)
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual((report['total'], report['created']), (9, 3))
+        self.assertEqual({e['row']: e['errors'][0] for e in report['errors']}, {
+            3: "email is not a valid email address",
+            4: "name is required",
+            6: "Duplicate of row 2",
+            7: "Already registered for this event",
+            8: "Missing answers for: T-Shirt Size",
+            11: "Event Full.",
+        })
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 4)
+        asha = Participant.objects.get(email="asha@x.com")
+        self.assertEqual(asha.college_key, "Mec")
+        self.assertEqual(asha.custom_responses, {"T-Shirt Size": "S"})
+        self.assertEqual(asha.user.username, "asha@x.com")
+
+    def test_rejects_unusable_sheets(self):
+        self.assertEqual(self.upload(["Name,Email,College", "Asha,asha@x.com,MEC"]).json()['error'],
+                         "Missing columns: phone, T-Shirt Size")
+        sheet = SimpleUploadedFile("students.txt", b"Name\nAsha")
+        response = self.client.post(f'/api/events/{self.event.id}/import_registrations/', {'file': sheet}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(User.objects.create_user(username="someone_else"))
+        self.assertEqual(self.upload(["Name"]).status_code, 403)
+
+class QrCodeTest(TestCase):
+    def setUp(self):
+        self.coordinator = User.objects.create_user(username="qr_coord")
+        self.event = Event.objects.create(title="Quiz", date=timezone.now() + timedelta(days=1), coordinator=self.coordinator)
+        self.participant = Participant.objects.create(event=self.event, name="Asha", email="asha@x.com", phone="1", college="MEC")
+        self.client = APIClient()
+
+    def test_png_rendered_on_demand_and_cacheable(self):
+        render_qr.cache_clear()
+        token = qr_token(self.participant.id)
+        self.assertEqual(token, qr_token(self.participant.id))
+        url = f'/api/participants/qr/{token}/'
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+            self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(render_qr.cache_info().hits, 1)
+        with PILImage.open(io.BytesIO(response.content)) as image:
+            image.verify()
+        self.assertEqual(self.client.get(f'/api/participants/qr/{self.participant.id}:forged/').status_code, 404)
+
+        self.client.force_authenticate(self.coordinator)
+        listed = self.client.get('/api/participants/').json()['results'][0]
+        self.assertEqual(listed['qr_token'], token)
+        self.assertTrue(listed['qr_code'].endswith(url))
+
+    def test_scan_requires_valid_signature(self):
+        self.client.force_authenticate(self.coordinator)
+        token = qr_token(self.participant.id)
+        forged = token.replace(f"{self.participant.id}:", f"{self.participant.id + 1}:", 1)
+        for payload in (f"ID:{self.participant.id}|Name:Asha", forged):
+            self.assertEqual(self.client.post('/api/participants/scan_qr/', {'qr_data': payload}).status_code, 400)
+        with override_settings(QR_ACCEPT_UNSIGNED=True):
+            self.assertEqual(self.client.post('/api/participants/scan_qr/', {'qr_data': f"ID:{self.participant.id}|Name:Asha"}).status_code, 200)
+        self.participant.attended = False
+        self.participant.save()
+        self.assertEqual(self.client.post('/api/participants/scan_qr/', {'qr_data': token}).status_code, 200)
+        self.participant.refresh_from_db()
+        self.assertTrue(self.participant.attended)
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.coordinator = User.objects.create_user(username="search_coord")
+        self.event = Event.objects.create(title="Hackathon", date=timezone.now() + timedelta(days=1), coordinator=self.coordinator)
+        self.other = other = Event.objects.create(title="Hack Quiz", date=timezone.now() + timedelta(days=2))
+        make = lambda event, name, email, **kwargs: Participant.objects.create(
+            event=event, name=name, email=email, phone=email, college="MEC", **kwargs
+        )
+        self.by_name = make(self.event, "Asha Rao", "rao@x.com")
+        self.by_team = make(self.event, "Ravi", "ravi@x.com", team_name="Asha Squad")
+        self.by_email = make(self.event, "Meena", "asha.m@x.com")
+        self.typo = make(self.event, "Prakash Iyer", "iyer@x.com")
+        make(other, "Asha Other", "other@x.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.coordinator)
+
+    def search(self, text, path='/api/participants/'):
+        return [row['id'] for row in self.client.get(path, {'search': text}).json()['results']]
+
+    def test_prefix_matches_ranked_by_field(self):
+        self.assertEqual(self.search('ash'), [self.by_name.id, self.by_team.id, self.by_email.id])
+        self.assertEqual(self.search('asha rao'), [self.by_name.id])
+        self.assertEqual(self.search('asha.m@x.com'), [self.by_email.id])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_misspelled_name_falls_back_to_similarity(self):
+        self.assertEqual(self.search('Prakesh'), [self.typo.id])
+        self.assertEqual(self.search('zzzz'), [])
+
+    def test_index_follows_writes(self):
+        Participant.objects.filter(pk=self.typo.pk).update(name="Zoya Iyer")
+        self.assertEqual(self.search('zoya'), [self.typo.id])
+        self.by_name.delete()
+        self.assertEqual(self.search('rao'), [])
+
+    def test_autocomplete(self):
+        rows = self.client.get('/api/participants/autocomplete/', {'search': 'as'}).json()
+        self.assertEqual([row['id'] for row in rows], [self.by_name.id, self.by_team.id, self.by_email.id])
+        self.assertEqual(set(rows[0]), {'id', 'name', 'team_name', 'event', 'event_title'})
+        self.assertEqual(self.client.get('/api/participants/autocomplete/').json(), [])
+
+        self.client.force_authenticate(None)
+        events = self.client.get('/api/events/autocomplete/', {'search': 'hack q'}).json()
+        self.assertEqual([event['title'] for event in events], ["Hack Quiz"])
+        self.assertCountEqual(self.search('hack', '/api/events/'), [self.event.id, self.other.id])
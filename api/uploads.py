@@ -0,0 +1,139 @@
+"""
+Resumable chunked uploads.
+
+A client declares the file (POST /api/uploads/), then PUTs it in pieces with
+``Content-Range: bytes <start>-<end>/<total>``. Chunks are appended to a
+partial file under ``UPLOAD_PARTIAL_DIR`` straight from the request stream,
+so nothing is held in memory and an interrupted upload resumes from
+``received`` (GET /api/uploads/<token>/). The last chunk validates the file
+and moves it into the default storage under the purpose's directory.
+"""
+import os
+import re
+import posixpath
+from PIL import Image, UnidentifiedImageError
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from .models import Upload
+
+IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/webp', 'image/gif'}
+
+# Accepted content types and final directory, per purpose
+PURPOSES = {
+    Upload.PURPOSE_PAYMENT_PROOF: {'types': IMAGE_TYPES, 'upload_to': 'payment_proofs/'},
+    Upload.PURPOSE_EVENT_PDF: {'types': {'application/pdf'}, 'upload_to': 'event_pdfs/'},
+}
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+COPY_BUFFER = 64 * 1024
+
+class UploadError(Exception):
+    """A chunk or file was rejected; ``status`` is the HTTP status to answer with."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def validate_declaration(purpose, content_type, size):
+    if purpose not in PURPOSES:
+        raise UploadError(f"Unknown purpose. Choose one of: {', '.join(PURPOSES)}")
+    if content_type not in PURPOSES[purpose]['types']:
+        raise UploadError(f"Content type {content_type!r} is not accepted for {purpose}")
+    max_size = settings.UPLOAD_MAX_SIZE[purpose]
+    if not 0 < size <= max_size:
+        raise UploadError(f"Size must be between 1 and {max_size} bytes")
+
+def parse_content_range(header):
+    """Returns (start, end) of ``Content-Range: bytes start-end/total``."""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError("Content-Range header must look like 'bytes 0-1048575/5000000'")
+    start, end, total = map(int, match.groups())
+    if end < start or end >= total:
+        raise UploadError("Invalid Content-Range")
+    return start, end, total
+
+def partial_path(upload):
+    return os.path.join(settings.UPLOAD_PARTIAL_DIR, upload.token.hex)
+
+def write_chunk(upload, stream, content_range):
+    """
+    Appends one chunk read from ``stream`` (the request body). Chunks must
+    arrive in order; a retried chunk that was already stored is accepted.
+    Returns True once the file is complete. Caller holds a row lock.
+    """
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if total != upload.size:
+        raise UploadError(f"Total size does not match the declared {upload.size} bytes")
+    if length > settings.UPLOAD_CHUNK_SIZE:
+        raise UploadError(f"Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes")
+    if upload.is_complete:
+        raise UploadError("Upload is already complete", status=409)
+    if start != upload.received:
+        if end < upload.received:
+            return False  # Duplicate of a stored chunk, e.g. a retry after a lost response
+        raise UploadError(f"Expected a chunk starting at byte {upload.received}", status=409)
+
+    os.makedirs(settings.UPLOAD_PARTIAL_DIR, exist_ok=True)
+    path = partial_path(upload)
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining:
+            data = stream.read(min(COPY_BUFFER, remaining))
+            if not data:
+                break
+            f.write(data)
+            remaining -= len(data)
+        f.truncate()
+    if remaining:
+        raise UploadError("Request body was shorter than the Content-Range")
+
+    upload.received = end + 1
+    if upload.received < upload.size:
+        upload.save(update_fields=['received'])
+        return False
+    finalize(upload)
+    return True
+
+def _check_contents(upload, path):
+    if upload.purpose == Upload.PURPOSE_PAYMENT_PROOF:
+        try:
+            with Image.open(path) as image:
+                image.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            raise UploadError("File is not a valid image")
+    elif upload.purpose == Upload.PURPOSE_EVENT_PDF:
+        with open(path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                raise UploadError("File is not a PDF")
+
+def finalize(upload):
+    """Validates the assembled file and moves it into storage."""
+    path = partial_path(upload)
+    try:
+        _check_contents(upload, path)
+    except UploadError:
+        # Let the client start over instead of resuming a bad file
+        os.remove(path)
+        upload.received = 0
+        upload.save(update_fields=['received'])
+        raise
+
+    name = posixpath.join(PURPOSES[upload.purpose]['upload_to'], f"{upload.token.hex[:12]}_{get_valid_filename(upload.filename)}")
+    with open(path, 'rb') as f:
+        upload.file.name = default_storage.save(name, File(f))
+    os.remove(path)
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['received', 'file', 'completed_at'])
+
+def discard(upload):
+    """Deletes an upload and whatever it has stored."""
+    if os.path.exists(partial_path(upload)):
+        os.remove(partial_path(upload))
+    if upload.file and not upload.used_at:
+        upload.file.delete(save=False)
+    upload.delete()
@@ -1,33 +1,71 @@
 import io
-import csv
-import re
 import random
 import string
-from django.http import HttpResponse
-from django.core.files.base import ContentFile
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.template.loader import render_to_string
-from django.db.models import Count, Avg, Q, Sum
-from rest_framework import viewsets, permissions, filters, status
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, mixins, permissions, status
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.views import APIView
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django_filters.rest_framework import DjangoFilterBackend
-from xhtml2pdf import pisa 
 
 # Explicit imports to avoid namespace pollution
 from .models import (
     Fest, Event, EventRound, Participant, Gallery, 
-    Feedback, TeamMember, Schedule
+    Feedback, TeamMember, Schedule, CertificateJob, Upload, normalize_college
 )
 from .serializers import (
     UserSerializer, FestSerializer, ScheduleSerializer, 
     EventSerializer, ParticipantSerializer, PublicParticipantSerializer, 
     EventRoundSerializer, GallerySerializer, FeedbackSerializer, 
-    TeamMemberSerializer
+    TeamMemberSerializer, CertificateJobSerializer, EventRankingSerializer, UploadSerializer
 )
 from .permissions import IsCoordinatorOrReadOnly
+from .fields import FieldSelectionMixin, select_fields
+from .cache import CachedReadMixin, cache_response, invalidate as invalidate_responses
+from .queue import enqueue
+from .analytics import event_analytics, fest_analytics
+from .pagination import DashboardCursorPagination
+from .exports import registration_rows, csv_response
+from .imports import SheetError, import_registrations
+from .leaderboard import college_leaderboard, invalidate_college_leaderboard
+from .metrics import registry as metrics_registry
+from .live import publish_participants
+from .uploads import UploadError, write_chunk
+from .students import StaffAccount, resolve_student
+from .bundles import bundle_response, fresh_snapshot, rebuild_snapshot
+from .qr import participant_id_from_qr, qr_token, render_qr
+from .search import RankedSearchFilter
+
+CHECK_IN_BATCH_LIMIT = 1000
+
+# Columns shown in the coordinator dashboard grid
+DASHBOARD_FIELDS = (
+    'id', 'name', 'team_name', 'email', 'phone', 'college', 'college_key',
+    'current_round', 'attended', 'is_winner', 'rank', 'registered_at'
+)
+
+def autocomplete(view, fields):
+    """The view's best ?search= matches, rendered with only ``fields``."""
+    if not view.request.query_params.get('search', '').strip():
+        return Response([])
+    queryset = select_fields(view.filter_queryset(view.get_queryset()), view.get_serializer(fields=fields))
+    serializer = view.get_serializer(queryset[:settings.SEARCH_AUTOCOMPLETE_LIMIT], many=True, fields=fields)
+    return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    """
+    Request metrics collected by MetricsMiddleware, in Prometheus text format.
+    """
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4')
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -45,30 +83,83 @@ def current_user(request):
         "is_coordinator": is_coordinator
     })
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(FieldSelectionMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
 
-class FestViewSet(viewsets.ModelViewSet):
+class FestViewSet(CachedReadMixin, FieldSelectionMixin, viewsets.ModelViewSet):
+    cache_namespace = 'fests'
     queryset = Fest.objects.all().order_by('-year')
     serializer_class = FestSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class ScheduleViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export_registrations(self, request, pk=None):
+        """
+        Export registrations for every event of the fest as one CSV.
+        Pass ?custom_fields=1 to add all events' custom fields as columns.
+        """
+        fest = self.get_object()
+        custom_fields = []
+        if request.query_params.get('custom_fields'):
+            for fields in fest.events.values_list('custom_fields', flat=True):
+                custom_fields.extend(f for f in fields or [] if f not in custom_fields)
+
+        participants = Participant.objects.filter(event__fest=fest)
+        rows = registration_rows(participants, custom_fields=custom_fields, include_event=True)
+        return csv_response(rows, f"{fest.name}_{fest.year}_registrations.csv")
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    def bundle(self, request, pk=None):
+        """
+        The fest, its events and schedule, the team and the gallery in one
+        precomputed, pre-compressed document (see api/bundles.py).
+        """
+        snapshot = fresh_snapshot(pk) if pk.isdigit() else None
+        if snapshot is None:
+            snapshot = rebuild_snapshot(self.get_object())
+        return bundle_response(request, snapshot)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def analytics(self, request, pk=None):
+        """
+        Fest-wide analytics across all events, with a per-event breakdown.
+        """
+        return Response(fest_analytics(self.get_object()))
+
+class ScheduleViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = Schedule.objects.all().order_by('start_time')
     serializer_class = ScheduleSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['fest']
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(CachedReadMixin, FieldSelectionMixin, viewsets.ModelViewSet):
+    cache_namespace = 'events'
     queryset = Event.objects.all().order_by('date')
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsCoordinatorOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter]
     filterset_fields = ['fest', 'is_team_event']
-    search_fields = ['title']
+    search_document = 'events'
+
+    # Actions that render EventSerializer and need its related data
+    SERIALIZING_ACTIONS = {'list', 'retrieve', 'my_events', 'update', 'partial_update'}
+
+    def get_queryset(self):
+        queryset = Event.objects.all().order_by('date')
+        if self.action not in self.SERIALIZING_ACTIONS:
+            return queryset
+        # Serializer reads fest/coordinator names, nested rounds and the
+        # registration count; resolve all of them up front so a page of
+        # events costs a fixed number of queries.
+        return (
+            queryset
+            .select_related('fest', 'coordinator')
+            .prefetch_related('rounds')
+            .annotate(registrations_total=Count('registrations'))
+        )
 
     def create(self, request, *args, **kwargs):
         # Custom creation logic to auto-generate coordinator user
@@ -106,13 +197,22 @@ class EventViewSet(viewsets.ModelViewSet):
         """
         Returns events managed by the current coordinator.
         """
-        if request.user.is_superuser:
-            events = Event.objects.all()
-        else:
-            events = Event.objects.filter(coordinator=request.user)
-        return Response(EventSerializer(events, many=True).data)
+        events = self.get_queryset()
+        if not request.user.is_superuser:
+            events = events.filter(coordinator=request.user)
+        events = select_fields(events, self.get_serializer())
+        return Response(self.get_serializer(events, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Events whose title starts with the words typed so far (?search=),
+        best match first.
+        """
+        return autocomplete(self, ['id', 'title', 'date'])
 
     @action(detail=True, methods=['get'])
+    @cache_response('standings')
     def results(self, request, pk=None):
         """
         Returns winners. Public if published, restricted otherwise.
@@ -127,10 +227,11 @@ class EventViewSet(viewsets.ModelViewSet):
              if not has_access:
                  return Response({"detail": "Results not yet published"}, status=403)
 
-        winners = event.registrations.filter(is_winner=True).order_by('rank')
+        winners = select_fields(event.registrations.filter(is_winner=True).order_by('rank'), ParticipantSerializer())
         return Response(ParticipantSerializer(winners, many=True).data)
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cache_response('standings')
     def qualifiers(self, request, pk=None):
         """
         Public leaderboard/status for ongoing rounds.
@@ -140,6 +241,7 @@ class EventViewSet(viewsets.ModelViewSet):
         return Response(PublicParticipantSerializer(participants, many=True).data)
     
     @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    @cache_response('standings')
     def eligible_students(self, request, pk=None):
         """
         Returns students eligible for the CURRENT round (not eliminated).
@@ -158,138 +260,160 @@ class EventViewSet(viewsets.ModelViewSet):
         Aggregates points by college.
         Rank 1 = 10 pts, Rank 2 = 5 pts, Rank 3 = 3 pts (Custom logic)
         """
-        # Logic: Iterate all winners and sum points for their college
-        colleges = {}
-        winners = Participant.objects.filter(is_winner=True)
-        
-        for p in winners:
-            points = 0
-            if p.rank == 1: points = 10
-            elif p.rank == 2: points = 5
-            elif p.rank == 3: points = 3
-            
-            # Normalize college name
-            college_name = p.college.strip().title()
-            if college_name in colleges:
-                colleges[college_name] += points
-            else:
-                colleges[college_name] = points
-        
-        # Sort by points desc
-        sorted_colleges = sorted(colleges.items(), key=lambda x: x[1], reverse=True)
-        data = [{"college": name, "points": pts} for name, pts in sorted_colleges]
-        return Response(data)
+        return Response(college_leaderboard())
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def dashboard_data(self, request, pk=None):
         """
-        Analytics for the event coordinator.
+        Cursor-paginated participant grid for the event coordinator.
+        Filters: ?round=, ?attended=true|false, ?college=
+        Sorting: ?ordering= (see DashboardCursorPagination.ordering_fields)
         """
         event = self.get_object()
-        if request.user != event.coordinator and not request.user.is_superuser:
+        if request.user.id != event.coordinator_id and not request.user.is_superuser:
             return Response({"error": "Unauthorized"}, status=403)
 
         participants = event.registrations.all()
+        params = request.query_params
+        if params.get('round'):
+            try:
+                participants = participants.filter(current_round=int(params['round']))
+            except ValueError:
+                return Response({"error": "round must be a number"}, status=400)
+        if params.get('attended') in ('true', 'false'):
+            participants = participants.filter(attended=params['attended'] == 'true')
+        if params.get('college'):
+            participants = participants.filter(college_key=normalize_college(params['college']))
+
+        paginator = DashboardCursorPagination()
+        rows = paginator.paginate_queryset(participants.values(*DASHBOARD_FIELDS), request, view=self)
         return Response({
-            "total_registrations": participants.count(),
+            "total_registrations": event.seats_taken,
             "rounds_config": EventRoundSerializer(event.rounds.all(), many=True).data,
-            "participants": ParticipantSerializer(participants, many=True).data
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "participants": rows
         })
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def export_registrations(self, request, pk=None):
         """
-        Export participant data as CSV.
+        Export participant data as CSV, streamed in chunks.
+        Pass ?custom_fields=1 to add the event's custom fields as columns.
         """
         event = self.get_object()
         if request.user != event.coordinator and not request.user.is_superuser:
             return Response({"error": "Unauthorized"}, status=403)
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{event.title}_registrations.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Name', 'Team Name', 'Email', 'Phone', 'College', 'Attended', 'Current Round', 'Rank', 'Winner', 'Payment Ref'])
+        custom_fields = event.custom_fields if request.query_params.get('custom_fields') else ()
+        rows = registration_rows(event.registrations.all(), custom_fields=custom_fields)
+        return csv_response(rows, f"{event.title}_registrations.csv")
+    
+    @action(detail=True, methods=['post'])
+    def import_registrations(self, request, pk=None):
+        """
+        Registers the students in an uploaded CSV/XLSX sheet (multipart
+        "file"; see api/imports.py). Invalid rows are reported, not fatal.
+        Pass ?dry_run=1 to only validate.
+        """
+        event = self.get_object()
+        if request.user != event.coordinator and not request.user.is_superuser:
+            return Response({"error": "Unauthorized"}, status=403)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the sheet as 'file'"}, status=400)
 
-        for p in event.registrations.all():
-            writer.writerow([
-                p.id, p.name, p.team_name or "N/A", p.email, p.phone, p.college,
-                "Yes" if p.attended else "No", p.current_round, p.rank or "-", "Yes" if p.is_winner else "No",
-                p.transaction_id or "N/A"
-            ])
+        try:
+            report = import_registrations(event, upload, dry_run=bool(request.query_params.get('dry_run')))
+        except SheetError as e:
+            return Response({"error": str(e)}, status=400)
+        if report['created']:
+            # bulk_create sends no signals
+            invalidate_responses('events', 'standings')
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
 
-        return response
-    
     @action(detail=True, methods=['get'])
     def analytics(self, request, pk=None):
-        event = self.get_object()
-        stats = {
-            "total_registrations": event.registrations.count(),
-            "attendance_rate": (event.registrations.filter(attended=True).count() / event.registrations.count() * 100) if event.registrations.exists() else 0,
-            "average_rating": event.feedbacks.aggregate(Avg('rating'))['rating__avg'] or 0,
-            "college_distribution": event.registrations.values('college').annotate(count=Count('id'))
-        }
-        return Response(stats)
+        """
+        Registration, attendance, round, college and feedback stats in two
+        aggregate queries, cached briefly for auto-refreshing dashboards.
+        """
+        return Response(event_analytics(self.get_object()))
 
     @action(detail=True, methods=['post'])
     def generate_certificates(self, request, pk=None):
         """
-        Generates PDF certificates for all attended participants.
+        Queues PDF certificate generation for all attended participants.
+        Poll certificate_status for progress.
         """
         event = self.get_object()
         if request.user != event.coordinator and not request.user.is_superuser:
             return Response({"error": "Unauthorized"}, status=403)
 
-        participants = event.registrations.filter(attended=True)
-        
-        generated_count = 0
-        errors = []
+        job = event.certificate_jobs.first()
+        if job and job.is_active:
+            return Response({
+                "detail": "Certificate generation is already in progress.",
+                "job": CertificateJobSerializer(job).data
+            }, status=status.HTTP_202_ACCEPTED)
 
-        for p in participants:
-            try:
-                template = 'certificates/participation.html'
-                context = {
-                    'participant_name': p.name,
-                    'college': p.college,
-                    'event_title': event.title,
-                    'fest_name': event.fest.name if event.fest else "NEURA",
-                    'year': event.date.year,
-                    'title': 'Participation',
-                    'type_class': 'participation'
-                }
-
-                if p.is_winner:
-                    context['title'] = 'Excellence'
-                    context['type_class'] = 'excellence'
-                    context['rank'] = p.rank
-
-                html = render_to_string(template, context)
-                result = io.BytesIO()
-                
-                # Generate PDF
-                pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
-                
-                if not pdf.err:
-                    # Save file without triggering another save signal immediately if possible
-                    p.certificate.save(f"cert_{p.id}.pdf", ContentFile(result.getvalue()), save=False)
-                    p.save(update_fields=['certificate'])
-                    generated_count += 1
-                else:
-                    errors.append(f"Error generating for {p.name}")
-
-            except Exception as e:
-                errors.append(f"Exception for {p.name}: {str(e)}")
-            
+        job = CertificateJob.objects.create(event=event, requested_by=request.user)
+        transaction.on_commit(lambda: enqueue('generate_certificates', job_id=job.id), robust=True)
         return Response({
-            "detail": f"Generated {generated_count} certificates.",
-            "errors": errors
-        })
+            "detail": "Certificate generation started.",
+            "job": CertificateJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
 
-class ParticipantViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    def rankings(self, request, pk=None):
+        """
+        Sets the event's final results in one go.
+        Body: {"rankings": [{"id": <participant>, "rank": 1}, ...]} ordered by rank.
+        Previous winners not in the list are cleared.
+        """
+        event = self.get_object()
+        serializer = EventRankingSerializer(data=request.data, context={'event': event})
+        serializer.is_valid(raise_exception=True)
+        ranks = {entry['id']: entry['rank'] for entry in serializer.validated_data['rankings']}
+
+        with transaction.atomic():
+            participants = list(
+                event.registrations.select_for_update()
+                .filter(Q(id__in=ranks) | Q(is_winner=True))
+                .only('id', 'rank', 'is_winner')
+            )
+            for p in participants:
+                p.rank = ranks.get(p.id)
+                p.is_winner = p.id in ranks
+            Participant.objects.bulk_update(participants, ['rank', 'is_winner'])
+            publish_participants(event.id, [
+                {"id": p.id, "rank": p.rank, "is_winner": p.is_winner} for p in participants
+            ])
+
+        # bulk_update sends no signals; expire dependents once
+        invalidate_college_leaderboard()
+        invalidate_responses('standings')
+        return Response({"msg": f"Ranked {len(ranks)} participants", "updated": len(participants)})
+
+    @action(detail=True, methods=['get'])
+    def certificate_status(self, request, pk=None):
+        """
+        Progress of the most recent certificate generation job.
+        """
+        event = self.get_object()
+        if request.user != event.coordinator and not request.user.is_superuser:
+            return Response({"error": "Unauthorized"}, status=403)
+
+        job = event.certificate_jobs.first()
+        if not job:
+            return Response({"detail": "No certificate generation has been requested."}, status=404)
+        return Response(CertificateJobSerializer(job).data)
+
+class ParticipantViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = ParticipantSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, RankedSearchFilter]
     filterset_fields = ['event', 'current_round', 'attended']
-    search_fields = ['name', 'team_name', 'email']
+    search_document = 'participants'
 
     def get_queryset(self):
         user = self.request.user
@@ -303,7 +427,7 @@ class ParticipantViewSet(viewsets.ModelViewSet):
         return Participant.objects.none()
 
     def get_permissions(self):
-        if self.action == 'create': return [permissions.AllowAny()]
+        if self.action in ('create', 'qr'): return [permissions.AllowAny()]
         if self.action == 'scan_qr': return [permissions.IsAuthenticated()] # Only admins/coordinators scan
         return [permissions.IsAuthenticated()]
 
@@ -313,17 +437,62 @@ class ParticipantViewSet(viewsets.ModelViewSet):
         next_round = request.data.get('next_round')
         if not ids or not next_round:
             return Response({"error": "IDs and next_round required"}, status=400)
-            
-        qs = Participant.objects.filter(id__in=ids)
-        updated = qs.update(current_round=next_round)
+        try:
+            ids = {int(pk) for pk in ids}
+            next_round = int(next_round)
+        except (TypeError, ValueError):
+            return Response({"error": "IDs and next_round must be integers"}, status=400)
+        if next_round < 1:
+            return Response({"error": "next_round must be at least 1"}, status=400)
+
+        # Only participants the user manages, all from one event
+        qs = self.get_queryset().filter(id__in=ids)
+        event_ids = set(qs.order_by().values_list('event_id', flat=True).distinct())
+        if len(event_ids) != 1 or qs.count() != len(ids):
+            return Response({"error": "Participants must all belong to one of your events"}, status=400)
+        event_id = event_ids.pop()
+
+        # Round N's selection_limit caps how many advance past it
+        rounds = dict(EventRound.objects.filter(event_id=event_id).values_list('round_number', 'selection_limit'))
+        if rounds and next_round > max(rounds):
+            return Response({"error": f"Event has only {max(rounds)} rounds"}, status=400)
+        limit = rounds.get(next_round - 1)
+
+        with transaction.atomic():
+            if limit is not None:
+                # Django drops FOR UPDATE from COUNT queries; lock the event
+                # row so concurrent promotes count one after the other
+                Event.objects.select_for_update().only('id').get(pk=event_id)
+                advanced = (
+                    Participant.objects.filter(event_id=event_id, current_round__gte=next_round)
+                    .exclude(id__in=ids).count()
+                )
+                if advanced + len(ids) > limit:
+                    return Response({
+                        "error": f"Only {limit} participants can advance to round {next_round}; "
+                                 f"{advanced} already have"
+                    }, status=400)
+            updated = qs.update(current_round=next_round)
+            publish_participants(event_id, [{"id": pk, "current_round": next_round} for pk in sorted(ids)])
+        invalidate_responses('standings')
         return Response({"msg": f"Promoted {updated} participants"})
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Check-in desk lookup: your participants matching the words typed so
+        far (?search=, ?event=), best match first, misspellings included.
+        """
+        return autocomplete(self, ['id', 'name', 'team_name', 'event', 'event_title'])
+
     @action(detail=True, methods=['patch'])
     def assign_rank(self, request, pk=None):
         p = self.get_object()
         p.rank = request.data.get('rank')
         p.is_winner = True
-        p.save()
+        p.save(update_fields=['rank', 'is_winner'])
+        invalidate_college_leaderboard()
+        publish_participants(p.event_id, [{"id": p.id, "rank": p.rank, "is_winner": True}])
         return Response({"status": "Rank updated"})
     
     @action(detail=True, methods=['patch'])
@@ -331,25 +500,35 @@ class ParticipantViewSet(viewsets.ModelViewSet):
         p = self.get_object()
         p.attended = not p.attended
         p.save()
+        publish_participants(p.event_id, [{"id": p.id, "attended": p.attended}])
         return Response({"status": "Attendance updated", "attended": p.attended})
     
+    @action(detail=False, methods=['get'], url_path=r'qr/(?P<token>[^/.]+)', authentication_classes=[])
+    def qr(self, request, token=None):
+        """
+        PNG of a participant's QR code. The signed token is the only input,
+        so the image never changes and can be cached indefinitely.
+        """
+        participant_id = participant_id_from_qr(token)
+        if participant_id is None or token != qr_token(participant_id):
+            return Response({"error": "Invalid QR token"}, status=404)
+        response = HttpResponse(render_qr(token), content_type='image/png')
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
     @action(detail=False, methods=['post'])
     def scan_qr(self, request):
         """
-        Parses QR data string and marks attendance.
-        Format expected: "ID:123|Name:John|..."
+        Verifies a scanned QR token and marks attendance.
         """
         qr_data = request.data.get('qr_data')
         if not qr_data:
             return Response({"error": "No QR data provided"}, status=400)
         
-        # Extract ID using Regex
-        match = re.search(r'ID:(\d+)', qr_data)
-        if not match:
+        participant_id = participant_id_from_qr(qr_data)
+        if participant_id is None:
             return Response({"error": "Invalid QR Format"}, status=400)
         
-        participant_id = match.group(1)
-        
         try:
             participant = Participant.objects.get(id=participant_id)
             
@@ -359,6 +538,7 @@ class ParticipantViewSet(viewsets.ModelViewSet):
                 
             participant.attended = True
             participant.save()
+            publish_participants(participant.event_id, [{"id": participant.id, "attended": True}])
             return Response({
                 "status": "success", 
                 "message": f"Marked present: {participant.name}",
@@ -367,33 +547,139 @@ class ParticipantViewSet(viewsets.ModelViewSet):
         except Participant.DoesNotExist:
             return Response({"error": "Participant not found"}, status=404)
 
+    def _check_in_scope(self, request):
+        """Participants the current user may check in."""
+        if request.user.is_superuser:
+            return Participant.objects.all()
+        return Participant.objects.filter(event__coordinator=request.user)
+
+    @action(detail=False, methods=['post'])
+    def check_in(self, request):
+        """
+        Lean gate check-in: one conditional UPDATE scoped to the
+        coordinator's events. Takes the same QR token as scan_qr.
+        """
+        participant_id = participant_id_from_qr(request.data.get('qr_data'))
+        if participant_id is None:
+            return Response({"error": "Invalid QR Format"}, status=400)
+
+        scope = self._check_in_scope(request).filter(id=participant_id)
+        if scope.filter(attended=False).update(attended=True):
+            return Response({"status": "success", "participant_id": participant_id})
+
+        # Nothing updated: either already checked in or not one of ours
+        if scope.exists():
+            return Response({"status": "duplicate", "participant_id": participant_id})
+        return Response({"error": "Participant not found for your events"}, status=404)
+
+    @action(detail=False, methods=['post'])
+    def check_in_batch(self, request):
+        """
+        Applies scans queued offline by the scanning app in one transaction.
+        Body: {"scans": ["<QR token>", ...]}
+        """
+        scans = request.data.get('scans')
+        if not isinstance(scans, list) or not scans:
+            return Response({"error": "scans must be a non-empty list"}, status=400)
+        if len(scans) > CHECK_IN_BATCH_LIMIT:
+            return Response({"error": f"At most {CHECK_IN_BATCH_LIMIT} scans per batch"}, status=400)
+
+        invalid = []
+        ids = []
+        for qr_data in scans:
+            participant_id = participant_id_from_qr(qr_data)
+            if participant_id is None:
+                invalid.append(qr_data)
+            else:
+                ids.append(participant_id)
+
+        with transaction.atomic():
+            scope = self._check_in_scope(request).filter(id__in=set(ids))
+            attendance = dict(scope.select_for_update().values_list('id', 'attended'))
+            to_mark = {pid for pid, was_attended in attendance.items() if not was_attended}
+            scope.filter(id__in=to_mark).update(attended=True)
+
+        checked_in, duplicates, not_found = [], [], []
+        seen = set()
+        for participant_id in ids:
+            if participant_id not in attendance:
+                not_found.append(participant_id)
+            elif participant_id in to_mark and participant_id not in seen:
+                checked_in.append(participant_id)
+            else:
+                duplicates.append(participant_id)
+            seen.add(participant_id)
+
+        return Response({
+            "checked_in": checked_in,
+            "duplicates": duplicates,
+            "not_found": not_found,
+            "invalid": invalid,
+        })
+
     @action(detail=False, methods=['get'])
     def me(self, request):
         if not request.user.is_authenticated:
             return Response({"error": "Login required"}, status=401)
-        registrations = Participant.objects.filter(user=request.user)
-        return Response(ParticipantSerializer(registrations, many=True).data)
+        registrations = select_fields(Participant.objects.filter(user=request.user), self.get_serializer())
+        return Response(self.get_serializer(registrations, many=True).data)
 
-class EventRoundViewSet(viewsets.ModelViewSet):
+class EventRoundViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = EventRound.objects.all()
     serializer_class = EventRoundSerializer
     permission_classes = [permissions.IsAuthenticated, IsCoordinatorOrReadOnly]
 
-class GalleryViewSet(viewsets.ModelViewSet):
+class GalleryViewSet(CachedReadMixin, FieldSelectionMixin, viewsets.ModelViewSet):
+    cache_namespace = 'gallery'
     queryset = Gallery.objects.all().order_by('-uploaded_at')
     serializer_class = GallerySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.AllowAny]
 
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(CachedReadMixin, FieldSelectionMixin, viewsets.ModelViewSet):
+    cache_namespace = 'team'
     queryset = TeamMember.objects.all().order_by('order')
     serializer_class = TeamMemberSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads (see api/uploads.py).
+    POST declares the file, PUT sends a chunk with a Content-Range header,
+    GET reports how many bytes arrived so an interrupted upload can resume.
+    """
+    serializer_class = UploadSerializer
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'token'
+    lookup_value_regex = '[0-9a-f-]{32,36}'
+
+    def get_queryset(self):
+        # The token is the capability; uploads started by a user stay theirs
+        queryset = Upload.objects.filter(used_at__isnull=True)
+        if self.request.user.is_authenticated:
+            return queryset.filter(Q(created_by=self.request.user) | Q(created_by__isnull=True))
+        return queryset.filter(created_by__isnull=True)
+
+    def perform_create(self, serializer):
+        user = self.request.user if self.request.user.is_authenticated else None
+        if serializer.validated_data['purpose'] == Upload.PURPOSE_EVENT_PDF and user is None:
+            raise NotAuthenticated()
+        serializer.save(created_by=user)
+
+    def update(self, request, token=None):
+        with transaction.atomic():
+            upload = get_object_or_404(self.get_queryset().select_for_update(), token=token)
+            try:
+                # Raw body, read incrementally; request.data is never parsed
+                write_chunk(upload, request.stream or io.BytesIO(), request.headers.get('Content-Range'))
+            except UploadError as e:
+                return Response({"error": str(e), "received": upload.received}, status=e.status)
+        return Response(UploadSerializer(upload).data)
+
 class StudentLoginView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -403,37 +689,18 @@ class StudentLoginView(APIView):
         if not credential:
             return Response({"error": "Please provide Email or Phone number"}, status=400)
 
-        # 1. Find the participant
-        participants = Participant.objects.filter(
-            Q(email__iexact=credential) | Q(phone=credential)
-        )
-        
-        if not participants.exists():
+        try:
+            user = resolve_student(credential)
+        except StaffAccount:
+            return Response({"error": "This email belongs to a staff account. Use the staff login."}, status=403)
+        if user is None:
             return Response({"error": "No registration found. Please register for an event first."}, status=404)
-        
+
         # TODO: IMPLEMENT OTP VERIFICATION HERE
         # Currently, this is a security risk as anyone with the email can login.
         # For production: Send OTP to `credential` -> Verify OTP -> Proceed.
-            
-        # 2. Get the primary participant record
-        participant = participants.first()
-        
-        # 3. Get or Create a Django User for this participant
-        user = participant.user
-        
-        if not user:
-            username = participant.email
-            if User.objects.filter(username=username).exists():
-                user = User.objects.get(username=username)
-            else:
-                user = User.objects.create_user(username=username, email=participant.email)
-                user.set_unusable_password() 
-                user.save()
-            
-            # Self-healing: Link ALL this student's registrations to this user
-            Participant.objects.filter(email=participant.email).update(user=user)
 
-        # 4. Generate JWT Token
+        # Generate JWT Token
         refresh = RefreshToken.for_user(user)
         
         return Response({
@@ -12,6 +12,9 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', os.getenv('SECRET_KEY', 'django-inse
 
 DEBUG = 'RENDER' not in os.environ
 
+# 'wsgi' or 'asgi'; picks the gunicorn worker (gunicorn.conf.py) and enables api/async_views.py
+SERVER_MODE = os.getenv('DJANGO_SERVER_MODE', 'wsgi')
+
 ALLOWED_HOSTS = []
 RENDER_EXTERNAL_HOSTNAME = os.environ.get('RENDER_EXTERNAL_HOSTNAME')
 if RENDER_EXTERNAL_HOSTNAME:
@@ -45,13 +48,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.MetricsMiddleware',
 ]
 
 REST_FRAMEWORK = {
@@ -103,6 +107,8 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # File-backed test database so threaded tests get real SQLite locking
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -125,4 +131,82 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
\ No newline at end of file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
+# Background tasks (see api/queue.py). Run `python manage.py run_worker` alongside the web process.
+TASK_QUEUE_BACKEND = os.getenv('TASK_QUEUE_BACKEND', 'api.queue.DatabaseBackend')
+TASK_MAX_ATTEMPTS = 3
+TASK_RETRY_DELAY = 10  # seconds, doubled on each retry
+TASK_STALE_AFTER = 600  # seconds before a 'running' task from a dead worker is reclaimed
+
+# Certificate generation (api/tasks.py::generate_certificates)
+CERTIFICATE_WORKERS = int(os.getenv('CERTIFICATE_WORKERS', min(4, os.cpu_count() or 1)))
+CERTIFICATE_PROGRESS_EVERY = 10  # participants between progress saves
+
+# Local memory is per process; set CACHE_BACKEND to a shared backend (file,
+# database, redis) when running more than one worker so invalidation reaches all of them.
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'neura-responses',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', os.path.join(BASE_DIR, '.response_cache')),
+    },
+    'none': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'neura-default'),
+    },
+    'responses': RESPONSE_CACHE_BACKENDS[os.getenv('RESPONSE_CACHE_BACKEND', 'locmem')],
+}
+
+# Public read endpoints (api/cache.py); model signals expire entries early
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 60 * 10  # seconds
+
+LEADERBOARD_CACHE_TIMEOUT = 60 * 60  # seconds; assign_rank invalidates it sooner
+
+ANALYTICS_CACHE_TIMEOUT = 15  # seconds; dashboards auto-refresh
+
+# Participant QR codes (api/qr.py)
+QR_CACHE_SIZE = 2048  # rendered PNGs kept per process
+QR_ACCEPT_UNSIGNED = os.getenv('QR_ACCEPT_UNSIGNED') == '1'  # scan codes printed before signing
+
+# Bulk registration import (api/imports.py)
+IMPORT_MAX_ROWS = 5000
+IMPORT_BATCH_SIZE = 500
+
+# Ranked search (api/search.py)
+SEARCH_AUTOCOMPLETE_LIMIT = 10
+
+STUDENT_LOGIN_CACHE_TIMEOUT = 60 * 5  # seconds; registration changes invalidate it sooner
+
+# Request metrics (api/middleware.py), served to admins at /api/metrics/
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '0'))  # fraction of requests, 0 disables
+METRICS_N_PLUS_ONE_THRESHOLD = 10  # identical SQL shapes in one request
+
+# Live spectator updates (api/live.py), served at /api/events/<id>/live/ in ASGI mode
+LIVE_BROKER = os.getenv('LIVE_BROKER', 'api.live.LocalBroker')
+LIVE_QUEUE_SIZE = 100  # pending messages per spectator before it is told to resync
+LIVE_HEARTBEAT = 15  # seconds between keepalive comments
+LIVE_RETRY_MS = 3000  # client reconnect delay
+# DatabaseBroker only (set LIVE_BROKER=api.live.DatabaseBroker with DJANGO_SERVER_MODE=asgi and more than one worker)
+LIVE_POLL_INTERVAL = 0.5  # seconds
+LIVE_POLL_OVERLAP = 2  # seconds re-read for rows that commit out of id order
+LIVE_MESSAGE_TTL = 60  # seconds before published messages are deleted
+
+# Image renditions (api/images.py), generated by the task queue after upload
+IMAGE_RENDITION_SIZES = {'thumb': 320, 'medium': 1280}  # longest side in px
+IMAGE_RENDITION_QUALITY = 80
+
+# Chunked uploads (api/uploads.py); partial files live outside MEDIA_ROOT until complete
+UPLOAD_PARTIAL_DIR = os.getenv('UPLOAD_PARTIAL_DIR', os.path.join(BASE_DIR, '.partial_uploads'))
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes per PUT
+UPLOAD_MAX_SIZE = {'payment_proof': 10 * 1024 * 1024, 'event_pdf': 50 * 1024 * 1024}
+UPLOAD_EXPIRY_HOURS = 24  # unfinished or unused uploads are purged after this
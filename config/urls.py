@@ -5,10 +5,11 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from api.views import (
     EventViewSet, FeedbackViewSet, GalleryViewSet, ScheduleViewSet, StudentLoginView,
-    ParticipantViewSet, FestViewSet, UserViewSet, TeamMemberViewSet, EventRoundViewSet, current_user
+    ParticipantViewSet, FestViewSet, UserViewSet, TeamMemberViewSet, EventRoundViewSet, UploadViewSet, current_user, metrics
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from api.async_views import async_urlpatterns, live_urlpatterns
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet)
@@ -20,11 +21,18 @@ router.register(r'gallery', GalleryViewSet)
 router.register(r'participants', ParticipantViewSet, basename='participants')
 router.register(r'users', UserViewSet)
 router.register(r'team', TeamMemberViewSet)
+router.register(r'uploads', UploadViewSet, basename='uploads')
+
+api_urls = router.urls
+if settings.SERVER_MODE == 'asgi':
+    # Live streams and async public reads; the latter defer to the router's views otherwise
+    api_urls = live_urlpatterns + async_urlpatterns(api_urls) + api_urls
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include(router.urls)),
+    path('api/', include(api_urls)),
     path('api/user/me/', current_user, name='current_user'),
+    path('api/metrics/', metrics, name='metrics'),
     path('api/student-login/', StudentLoginView.as_view(), name='student_login'),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
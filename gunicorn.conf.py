@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for both deployment modes.
+
+DJANGO_SERVER_MODE=asgi serves config.asgi with uvicorn workers, which enables
+the async public read views (api/async_views.py); anything else keeps the
+classic sync WSGI workers.
+
+RUN_TASK_WORKER=1 also starts ``manage.py run_worker`` next to the web
+workers, so background tasks read and write the same media files and file
+caches as the requests that queue them.
+"""
+import os
+import sys
+import subprocess
+
+if os.getenv('DJANGO_SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+errorlog = '-'
+
+run_task_worker = os.getenv('RUN_TASK_WORKER') == '1'
+_task_worker = None
+
+def when_ready(server):
+    global _task_worker
+    if run_task_worker:
+        manage = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')
+        _task_worker = subprocess.Popen([sys.executable, manage, 'run_worker'])
+        server.log.info("Started task worker (pid %s)", _task_worker.pid)
+
+def on_exit(server):
+    if _task_worker is not None:
+        _task_worker.terminate()
+        try:
+            _task_worker.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            _task_worker.kill()